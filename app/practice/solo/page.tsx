@@ -45,6 +45,8 @@ export default function SoloPracticePage() {
   const [analysisResult, setAnalysisResult] = useState<SpeechAnalysis | null>(null)
   const [isEndingSession, setIsEndingSession] = useState(false)
   const [isAnalyzing, setIsAnalyzing] = useState(false)
+  // Names the Streamlit analyser's recording so the report can include its vocal summary
+  const [vocalSessionId] = useState(() => crypto.randomUUID())
   const [sessionData, setSessionData] = useState({
   mediapipe_data: {
     session_duration: 0,
@@ -352,7 +354,8 @@ const collectSessionDataAndGenerateReport = async () => {
               hand_gestures_seconds: data.handGesturesSeconds,
               speaking_seconds: data.speakingSeconds
             },
-            text_chunks: data.textChunks
+            text_chunks: data.textChunks,
+            vocal_session: vocalSessionId
           })
         })
 
@@ -1241,7 +1244,7 @@ if (currentStep === "speaking") {
               <div className="h-full relative">
                 {isStreamlitReady ? (
                   <iframe
-                    src="http://localhost:8501/"
+                    src={`http://localhost:8501/?vocal_session=${vocalSessionId}`}
                     className="w-full h-full border-0"
                     title="Streamlit Audio Analysis"
                     onError={() => {
@@ -13,10 +13,17 @@ import uuid
 from typing import Dict, List,Optional
 import psutil
 import subprocess
+import sys
 import asyncio
 from dotenv import load_dotenv
+from vocal.config import SAMPLE_RATE
+from vocal.ingest import MAX_SAMPLE_RATE, MIN_HOP_SECONDS, MIN_SAMPLE_RATE, PCM_FORMATS, StreamLimitError, record_payload
+from vocal.scheduler import PoolFullError, StreamScheduler, WorkerLostError
+from vocal.session import SESSION_DIR, session_summary, valid_session_id
+from vocal.warmup import configure_jit_cache
 load_dotenv()
 API_KEY = os.getenv("GOOGLE_API")
+configure_jit_cache() # Share the analyser's compiled-code cache with the warm-up process
 
 base_prompt = """
 You are a speech specialist, based on the text input you will recieve, assess the speech based on grammar and other public speaking skill such that the user can
@@ -34,6 +41,7 @@ Audio Transcripts: {transcripts}
 Posture Analysis: Good posture maintained for {good_posture_seconds} out of {total_seconds} seconds ({posture_percentage}%)
 Hand Gestures: Hand gestures detected for {hand_gestures_seconds} out of {total_seconds} seconds ({gestures_percentage}%)
 Speaking Activity: Active speaking detected for {speaking_seconds} out of {total_seconds} seconds ({speaking_percentage}%)
+Vocal Delivery: {vocal_summary}
 
 Please provide:
 1. Overall Performance Summary (2-3 sentences)
@@ -74,6 +82,7 @@ class TextChunk(BaseModel):
 class SessionData(BaseModel):
     mediapipe_data: MediaPipeData
     text_chunks: list[TextChunk]
+    vocal_session: Optional[str] = None # Id the page passed to the Streamlit analyser (?vocal_session=), if it ran
 
 
 class RoomData(BaseModel):
@@ -131,6 +140,26 @@ async def call_gemini(message):
     response = await chain.ainvoke({"text":message})
     return response
 
+def describe_vocal_session(session_id):
+    """One-line description of a recorded vocal session for the report prompt"""
+    # Only the session the client names: any other recording may belong to another speaker
+    if not valid_session_id(session_id):
+        return "No vocal analysis was recorded for this session."
+    path = os.path.join(SESSION_DIR, session_id)
+    if not os.path.isdir(path):
+        return "No vocal analysis was recorded for this session."
+    summary = session_summary(path)
+    if summary is None:
+        return "No vocal analysis was recorded for this session."
+    alerts = ", ".join(f"{rule} in {round(share * 100)}% of segments" for rule, share in
+                       sorted(summary["alerts"].items(), key=lambda item: -item[1]))
+    return (
+        f"average pitch {summary['pitch_mean']} Hz (variation {summary['pitch_std']} Hz), "
+        f"loudness {summary['rms_mean']} RMS, tempo {summary['tempo']} BPM, "
+        f"voice present in {round(summary['speech_ratio'] * 100)}% of {summary['chunks']} analysed segments. "
+        f"Issues flagged: {alerts or 'none'}."
+    )
+
 async def generate_final_report(session_data: SessionData):
     text_chunks = session_data.text_chunks
     mediapipe_data = session_data.mediapipe_data
@@ -155,7 +184,9 @@ async def generate_final_report(session_data: SessionData):
         "hand_gestures_seconds": mediapipe_data.hand_gestures_seconds,
         "gestures_percentage": gestures_percentage,
         "speaking_seconds": mediapipe_data.speaking_seconds,
-        "speaking_percentage": speaking_percentage
+        "speaking_percentage": speaking_percentage,
+        # Memory-mapped from disk, so run it off the event loop
+        "vocal_summary": await asyncio.to_thread(describe_vocal_session, session_data.vocal_session)
     })
     
     return report
@@ -221,6 +252,118 @@ async def websocket_endpoint(websocket: WebSocket):
         await manager.disconnect(websocket)
         print(f"[WEBSOCKET] Connection cleanup complete. Remaining connections: {len(manager.active_connections)}")
 
+# Server-side vocal analysis: clients stream raw PCM audio as binary messages and
+# get feature/alert JSON back on the same socket, one message per analysed hop.
+# Each stream is pinned to one process of a shared worker pool, so concurrent
+# speakers across rooms are analysed on all cores; processes start with the
+# first stream placed on them, so an API nobody streams to runs none
+vocal_scheduler = StreamScheduler()
+
+@app.websocket("/ws/vocal")
+async def vocal_analysis_websocket(websocket: WebSocket):
+    """
+    Query parameters: sample_rate (default the analysis rate, MIN_SAMPLE_RATE
+    to MAX_SAMPLE_RATE), format ("f32" or "s16", little-endian), channels
+    (interleaved), hop (seconds between updates, at least MIN_HOP_SECONDS).
+    Send {"type": "reset"} as text to start a new window. Out-of-range values
+    close the socket with 1008 (policy violation).
+    """
+    await websocket.accept()
+    params = websocket.query_params
+    try:
+        stream_id, opened = vocal_scheduler.open(
+            sample_rate=int(params.get("sample_rate", SAMPLE_RATE)),
+            fmt=params.get("format", "f32"),
+            channels=int(params.get("channels", 1)),
+            hop_seconds=float(params.get("hop", 0.5))
+        )
+    except PoolFullError as e:
+        await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+        await websocket.close(code=1013) # Try again later
+        return
+    except WorkerLostError as e:
+        await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+        await websocket.close(code=1011)
+        return
+    except ValueError as e:
+        await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+        await websocket.close(code=1003)
+        return
+
+    try:
+        try:
+            hop_seconds = await asyncio.wrap_future(opened)
+        except StreamLimitError as e:
+            await websocket.send_text(json.dumps({
+                "type": "error", "message": str(e),
+                "limits": {"sample_rate": [MIN_SAMPLE_RATE, MAX_SAMPLE_RATE], "min_hop": MIN_HOP_SECONDS}
+            }))
+            await websocket.close(code=1008)
+            return
+        except ValueError as e:
+            await websocket.send_text(json.dumps({"type": "error", "message": str(e), "formats": sorted(PCM_FORMATS)}))
+            await websocket.close(code=1003)
+            return
+
+        print(f"[VOCAL] Stream {stream_id[:8]} connected: {params.get('sample_rate', SAMPLE_RATE)} Hz")
+        await websocket.send_text(json.dumps({
+            "type": "vocal_ready",
+            "analysis_sample_rate": SAMPLE_RATE,
+            "hop_seconds": hop_seconds
+        }))
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is not None:
+                try:
+                    # Analysis runs on the stream's worker process; the event loop only waits for it
+                    results = await asyncio.wrap_future(vocal_scheduler.feed(stream_id, message["bytes"]))
+                except ValueError as e:
+                    await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+                    continue
+                for timestamp, record, alerts in results:
+                    await websocket.send_text(json.dumps({
+                        "type": "vocal_features",
+                        "timestamp": timestamp,
+                        "features": record_payload(record),
+                        "alerts": alerts
+                    }))
+            elif message.get("text") is not None:
+                try:
+                    command = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    command = {}
+                if command.get("type") == "reset":
+                    await asyncio.wrap_future(vocal_scheduler.reset(stream_id))
+                    await websocket.send_text(json.dumps({"type": "vocal_reset"}))
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        # e.g. WorkerLostError: the process holding this stream's state died
+        print(f"[VOCAL] Error: {e}")
+        try:
+            await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+            await websocket.close(code=1011)
+        except Exception:
+            pass # Client already gone
+    finally:
+        vocal_scheduler.close(stream_id)
+        print(f"[VOCAL] Stream {stream_id[:8]} disconnected")
+
+@app.get("/vocal/workers")
+async def vocal_worker_load():
+    """Per-worker load of the vocal analysis pool"""
+    workers = vocal_scheduler.load()
+    return {
+        "workers": workers,
+        "streams": sum(w["streams"] for w in workers),
+        "capacity": vocal_scheduler.capacity
+    }
+
 # ADD: Enhanced room data structure and management
 active_rooms: Dict[str, dict] = {}
 room_connections: Dict[str, List[WebSocket]] = {}
@@ -273,6 +416,7 @@ async def create_room(room_data: RoomData):
                 "--server.headless", "true",
                 "--browser.gatherUsageStats", "false"
             ], cwd=backend_dir)
+            start_analyzer_warmup(backend_dir)
             
             print(f"✅ Streamlit started early with PID: {streamlit_process.pid}")
             
@@ -507,7 +651,9 @@ async def websocket_room_endpoint(websocket: WebSocket, room_id: str):
                         await broadcast_to_room(room_id, {
                             "type": "speaking_started",
                             "room": room,
-                            "current_speaker": room["current_speaker"]
+                            "current_speaker": room["current_speaker"],
+                            # The speaker streams their microphone here for pooled server-side analysis
+                            "vocal_endpoint": "/ws/vocal"
                         })
 
                 elif message["type"] == "speaker_finished":
@@ -757,6 +903,40 @@ async def submit_group_member_data(request: Request):
 # Global variable to track Streamlit process
 streamlit_process: Optional[subprocess.Popen] = None
 
+# The vocal analyser is JIT-compiled in a separate process started alongside
+# each Streamlit (re)start; it writes ANALYZER_READY_FILE once the on-disk
+# compiled-code cache is warm. That only spares Streamlit's analysis workers
+# the compilation: each page still starts its own workers, which import the
+# analyser behind a "warming up" spinner (the Streamlit process itself never
+# imports it)
+ANALYZER_READY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".analyzer_ready")
+warmup_process: Optional[subprocess.Popen] = None
+
+def start_analyzer_warmup(backend_dir):
+    """Warm up the vocal analyser in the background for a newly started Streamlit process"""
+    global warmup_process
+    # A ready file (or a warm-up in flight) from an earlier Streamlit process says nothing about this one
+    if warmup_process and warmup_process.poll() is None:
+        warmup_process.terminate()
+        warmup_process.wait(timeout=5) # So it cannot write the ready file after it is removed
+    if os.path.exists(ANALYZER_READY_FILE):
+        os.remove(ANALYZER_READY_FILE)
+    try:
+        warmup_process = subprocess.Popen([
+            sys.executable, "-m", "vocal.warmup",
+            "--ready-file", ANALYZER_READY_FILE
+        ], cwd=backend_dir)
+        print(f"🔥 Warming up vocal analyser with PID: {warmup_process.pid}")
+    except Exception as e:
+        print(f"❌ Error starting analyser warm-up: {e}")
+
+def analyzer_warm():
+    """Whether the compiled-code cache warm-up has finished (or is not being tracked)"""
+    if os.path.exists(ANALYZER_READY_FILE):
+        return True
+    # Never started here, or failed: the Streamlit app still warms its own workers
+    return warmup_process is None or warmup_process.poll() not in (None, 0)
+
 def check_streamlit_processes():
     """Check for running Streamlit processes"""
     try:
@@ -815,6 +995,9 @@ async def startup_event():
     print("FastAPI startup: Ensuring clean Streamlit state...")
     kill_existing_streamlit_processes()
     streamlit_process = None
+    # A ready file from a previous run says nothing about this one
+    if os.path.exists(ANALYZER_READY_FILE):
+        os.remove(ANALYZER_READY_FILE)
     print("FastAPI startup complete")
 
 # WebSocket endpoint for Streamlit service control
@@ -847,6 +1030,7 @@ async def streamlit_control_websocket(websocket: WebSocket):
                             "--server.headless", "true",
                             "--browser.gatherUsageStats", "false"
                         ], cwd=backend_dir)
+                        start_analyzer_warmup(backend_dir)
                         
                         # Wait a moment for Streamlit to start
                         await asyncio.sleep(3)
@@ -950,6 +1134,9 @@ async def streamlit_control_websocket(websocket: WebSocket):
 @app.on_event("shutdown")
 async def shutdown_event():
     global streamlit_process
+    if warmup_process and warmup_process.poll() is None:
+        warmup_process.terminate()
+    vocal_scheduler.shutdown()
     if streamlit_process and streamlit_process.poll() is None:
         try:
             streamlit_process.terminate()
@@ -1029,6 +1216,9 @@ async def streamlit_ready():
             async with httpx.AsyncClient(timeout=2.0) as client:
                 response = await client.get("http://localhost:8501/healthz")
                 if response.status_code == 200:
+                    if not analyzer_warm():
+                        # Serving pages, but the page's workers would still JIT-compile from scratch
+                        return {"status": "running", "ready": False, "responsive": True, "warming_up": True}
                     return {"status": "running", "ready": True, "responsive": True}
                 else:
                     return {"status": "running", "ready": False, "responsive": False}
@@ -1,254 +1,59 @@
 import streamlit as st
-import sounddevice as sd
-import numpy as np
-import librosa
-import pandas as pd
+import atexit
 import time # To potentially add a small sleep for CPU management
 import altair as alt
 import warnings
+import functools
+
+from vocal.capture import MicrophoneCapture
+from vocal.config import (
+    CHUNK_SECONDS, IDEAL_PITCH_MAX, IDEAL_PITCH_MIN, IDEAL_RMS_MAX, IDEAL_RMS_MIN,
+    IDEAL_TEMPO_MAX, IDEAL_TEMPO_MIN, SAMPLE_RATE, aligned_hop_samples
+)
+from vocal.decimate import MAX_CHART_POINTS, decimated_range
+from vocal.history import FeatureHistory
+from vocal.session import SessionWriter, load_session, valid_session_id
+from vocal.timing import timing_enabled
+from vocal.workers import FeatureWorkerPool
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 warnings.filterwarnings('ignore', category=FutureWarning)
 
 # --- Configuration ---
-sr = 22050
-duration = 3 # seconds per audio chunk
+sr = SAMPLE_RATE
+duration = CHUNK_SECONDS # seconds per audio chunk
+capture_buffer_seconds = 30 # audio the capture ring buffer holds if analysis falls behind
+incremental = True # update every `update_hop` seconds over a sliding `duration`-second window
+update_hop = 0.25 # seconds between feedback updates in incremental mode
+fast_window = 1.0 # loudness and pitch are summarised over the last second...
+slow_update_hop = 1.0 # ...tempo, pitch variation and spectral shape over `duration` seconds, this often
+analysis_max_pending = 4 # chunks queued for the workers before the oldest is dropped
+max_history_seconds = 30 # Display last 30 seconds of data
+# Time ranges the full-session overview can show (None = the whole session); each
+# is decimated to at most MAX_CHART_POINTS points per chart, so narrower ranges show more detail
+overview_ranges = {"Whole session": None, "Last 30 min": 1800, "Last 10 min": 600, "Last 2 min": 120}
 
-# --- Helper for Normalization ---
-def normalize_feature(value, min_val, max_val):
-    """Normalize a value to the range [0, 1] given min and max possible values."""
-    if max_val == min_val: # Avoid division by zero, return midpoint
-        return 0.5
-    return (value - min_val) / (max_val - min_val)
-
-# --- Define expected min/max for normalization (adjust as needed) ---
-# These are rough estimates; you might fine-tune them based on typical vocal ranges.
-MIN_PITCH = 50   # Hz (for very low voices, e.g., male fundamental)
-MAX_PITCH = 400  # Hz (for relatively high voices, e.g., female fundamental)
-
-MIN_RMS = 0.001  # A very quiet sound
-MAX_RMS = 0.25   # A loud sound (can go higher but this keeps typical speech visible)
-
-MIN_TEMPO = 60   # BPM (very slow speaking)
-MAX_TEMPO = 200  # BPM (very fast speaking)
-
-# --- Define ideal ranges for public speaking ---
-IDEAL_PITCH_MIN = 100  # Hz - lower bound of ideal pitch range
-IDEAL_PITCH_MAX = 250  # Hz - upper bound of ideal pitch range
-
-IDEAL_RMS_MIN = 0.03   # lower bound of ideal loudness
-IDEAL_RMS_MAX = 0.12   # upper bound of ideal loudness
-
-IDEAL_TEMPO_MIN = 120  # BPM - lower bound of ideal speaking tempo
-IDEAL_TEMPO_MAX = 150  # BPM - upper bound of ideal speaking tempo
-
-
-# --- Feature Extraction Function ---
-def extract_features(audio, sr):
-    features = {}
-    # Clean the audio buffer to prevent "not finite everywhere" errors
-    audio = np.nan_to_num(audio, nan=0.0, posinf=0.0, neginf=0.0)
-    
-    if len(audio.shape) > 1:
-        audio = np.mean(audio, axis=1)
-
-    # Ensure audio is float32 for librosa operations if it's not already
-    audio = audio.astype(np.float32)
-    
-    # Clip audio to reasonable range to prevent overflow
-    audio = np.clip(audio, -1.0, 1.0)
-
-    # Handle very short or silent audio chunks at the beginning
-    if len(audio) < sr * 0.1 or np.all(np.abs(audio) < 1e-6): # If very short or near silent
-        return {
-            "pitch_mean": 0.0, "pitch_std": 0.0, "rms_mean": 0.0,
-            "zcr_mean": 0.0, "tempo": 0.0, "mfccs": [0.0]*13,
-            "spectral_centroid": 0.0, "spectral_bandwidth": 0.0, "chroma_mean": 0.0,
-            "mfcc_plot_data": np.zeros((13,1)) # Placeholder for MFCC plot data
-        }
-
-    # Pitch tracking (using librosa.pyin for better accuracy for voice)
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            f0, voiced_flag, voiced_probabilities = librosa.pyin(
-                y=audio, sr=sr, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C5'),
-                frame_length=2048, # Increase frame_length for more stable pitch tracking on longer chunks
-                hop_length=512 # Smaller hop_length for more detail
-            )
-            pitches = f0[~np.isnan(f0) & np.isfinite(f0)]
-            features["pitch_mean"] = float(np.mean(pitches)) if len(pitches) > 0 else 0.0
-            features["pitch_std"] = float(np.std(pitches)) if len(pitches) > 0 else 0.0
-    except Exception: # Catch broader exceptions for robustness
-        features["pitch_mean"] = 0.0
-        features["pitch_std"] = 0.0
-    
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            rms_values = librosa.feature.rms(y=audio)
-            features["rms_mean"] = float(np.mean(rms_values[np.isfinite(rms_values)]))
-    except Exception:
-        features["rms_mean"] = 0.0
-        
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            zcr_values = librosa.feature.zero_crossing_rate(y=audio)
-            features["zcr_mean"] = float(np.mean(zcr_values[np.isfinite(zcr_values)]))
-    except Exception:
-        features["zcr_mean"] = 0.0
-        
-    # Tempo (requires sufficient audio length)
-    try:
-        if len(audio) >= sr * 2: # At least 2 seconds for tempo estimation
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                # Use the updated path if available, fall back to the old one
-                try:
-                    from librosa.feature.rhythm import tempo
-                    tempo_val = tempo(y=audio, sr=sr)[0]
-                except ImportError:
-                    tempo_val = librosa.beat.tempo(y=audio, sr=sr)[0]
-                features["tempo"] = float(tempo_val) if np.isfinite(tempo_val) else 0.0
-        else:
-            features["tempo"] = 0.0
-    except Exception:
-        features["tempo"] = 0.0
-        
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-            mfcc_means = np.mean(mfccs, axis=1)
-            mfcc_means = mfcc_means[np.isfinite(mfcc_means)]
-            if len(mfcc_means) >= 13:
-                features["mfccs"] = [float(val) for val in mfcc_means[:13]]
-            else:
-                features["mfccs"] = [0.0]*13
-            features["mfcc_plot_data"] = mfccs # Store raw MFCCs for plotting
-    except Exception:
-        features["mfccs"] = [0.0]*13
-        features["mfcc_plot_data"] = np.zeros((13,1)) # Placeholder for MFCC plot data
-
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            sc_values = librosa.feature.spectral_centroid(y=audio, sr=sr)
-            features["spectral_centroid"] = float(np.mean(sc_values[np.isfinite(sc_values)]))
-    except Exception:
-        features["spectral_centroid"] = 0.0
-        
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            sb_values = librosa.feature.spectral_bandwidth(y=audio, sr=sr)
-            features["spectral_bandwidth"] = float(np.mean(sb_values[np.isfinite(sb_values)]))
-    except Exception:
-        features["spectral_bandwidth"] = 0.0
-        
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            chroma_values = librosa.feature.chroma_stft(y=audio, sr=sr)
-            features["chroma_mean"] = float(np.mean(chroma_values[np.isfinite(chroma_values)]))
-    except Exception:
-        features["chroma_mean"] = 0.0
-        
-    return features
-
-# --- Speech Analysis (Alerts) Function ---
-def analyze_speech(features):
-    alerts = []
-
-    # Helper function to safely get feature values
-    def get_feature(feature_name, default_value=0.0):
-        return features.get(feature_name, default_value)
-
-    pitch_mean = get_feature("pitch_mean")
-    pitch_std = get_feature("pitch_std")
-    rms_mean = get_feature("rms_mean")
-    tempo = get_feature("tempo")
-    zcr_mean = get_feature("zcr_mean")
-    spectral_centroid = get_feature("spectral_centroid")
-    spectral_bandwidth = get_feature("spectral_bandwidth")
-    chroma_mean = get_feature("chroma_mean")
-
-    # 🎵 Pitch
-    if pitch_mean > 0: # Only alert if pitch was detected
-        # These thresholds are for typical speech (adult male/female)
-        # Adjust as needed for specific target ranges
-        if pitch_mean < 80: # Very low pitch (e.g., whispering or extremely deep voice)
-            alerts.append("📢 Your pitch is quite low. Try speaking with more energy or varying your tone.")
-        elif pitch_mean > 280: # Very high pitch
-            alerts.append("📢 Your pitch is unusually high. Consider a more relaxed, natural tone.")
-
-    if pitch_std > 0 and pitch_std < 13: # Low variation in pitch
-        alerts.append("🎙️ Your voice lacks variation. Try adding some pitch dynamics for expressiveness.")
-
-    # 🔊 Loudness / Energy
-    if rms_mean < 0.015:
-        alerts.append("🔈 You're speaking too softly. Increase your volume for better audibility.")
-    elif rms_mean > 0.18:
-        alerts.append("🔊 Your volume is quite high. Lower it slightly to avoid sounding aggressive.")
-
-    # 🕒 Tempo
-    if tempo > 0: # Only alert if tempo was estimated
-        if tempo < 90:
-            alerts.append("🐢 You may be speaking too slowly. Increase your pace to keep listeners engaged.")
-        elif tempo > 160:
-            alerts.append("⚡ You're speaking too fast. Try slowing down for better clarity and comprehension.")
-
-    # 🫧 Articulation via ZCR (Zero Crossing Rate)
-    # High ZCR can indicate noise, sibilance, or very rapid, crisp articulation
-    if zcr_mean > 0.15:
-        alerts.append("💨 Your speech has high sibilance or sharpness. Focus on precise articulation without hissing.")
-
-    # 🧠 Spectral Centroid (Vocal Brightness/Muffledness)
-    if spectral_centroid > 0 and spectral_centroid < 1500: # Lower values can indicate a muffled or dull sound
-        alerts.append("🔈 Your voice might sound a bit muffled. Try to speak more clearly or with more frontal resonance.")
-
-    # 📶 Spectral Bandwidth (Vocal Fullness/Resonance)
-    if spectral_bandwidth > 0 and spectral_bandwidth < 1800: # Lower values can indicate a thin or less resonant voice
-        alerts.append("📉 Your voice may sound dull or lack fullness — try increasing enunciation and opening your mouth more.")
-
-    # 🎶 Chroma (Vocal Expressiveness/Musicality)
-    if chroma_mean > 0 and chroma_mean < 0.3: # Lower values can indicate less harmonic richness or expressiveness
-        alerts.append("🎵 Add more pitch variation for a dynamic voice. Let your voice rise and fall to convey emotion.")
-
-    return alerts
 
 # --- Function to create individual plots with shaded ideal ranges ---
-def create_individual_plot(df, metric, title, y_label, ideal_min, ideal_max, color):
-    """Create an individual plot with shaded ideal range"""
-    if df.empty:
-        return None
-    
-    # Create base chart with updated Altair syntax
+HISTORY_DATASET = "history" # Named Vega-Lite dataset that new rows are streamed into
+
+@functools.lru_cache(maxsize=None)
+def _chart_spec(metric, title, y_label, ideal_min, ideal_max, color):
+    """Build the Vega-Lite spec for one metric once; only its data changes afterwards."""
     brush = alt.selection_interval(bind='scales')
-    base = alt.Chart(df).add_params(brush)  # Updated from add_selection to add_params
-    
-    # Create a separate dataframe for the shaded region
-    time_range = [df['Time (s)'].min(), df['Time (s)'].max()]
-    shade_data = pd.DataFrame({
-        'Time (s)': time_range,
-        'ideal_min': [ideal_min, ideal_min],
-        'ideal_max': [ideal_max, ideal_max]
-    })
-    
-    # Create the shaded ideal range
-    ideal_range = alt.Chart(shade_data).mark_area(
+
+    # Static shaded ideal range spanning the whole time axis; it carries no history data
+    ideal_range = alt.Chart(alt.InlineData(values=[{}])).mark_rect(
         opacity=0.3,
         color='lightgreen'
     ).encode(
-        x=alt.X('Time (s):Q', title='Time (seconds)'),
-        y='ideal_min:Q',
-        y2='ideal_max:Q'
+        y=alt.Y(datum=ideal_min, type='quantitative'),
+        y2=alt.Y2(datum=ideal_max)
     )
     
-    # Create the line chart
-    line = base.mark_line(
+    # Create the line chart over the named, appendable history dataset
+    line = alt.Chart(alt.NamedData(HISTORY_DATASET)).mark_line(
         point=True,
         color=color,
         strokeWidth=2
@@ -256,7 +61,7 @@ def create_individual_plot(df, metric, title, y_label, ideal_min, ideal_max, col
         x=alt.X('Time (s):Q', title='Time (seconds)'),
         y=alt.Y(f'{metric}:Q', title=y_label),
         tooltip=['Time (s):Q', f'{metric}:Q']
-    )
+    ).add_params(brush)
     
     # Combine the charts
     chart = (ideal_range + line).resolve_scale(
@@ -267,7 +72,41 @@ def create_individual_plot(df, metric, title, y_label, ideal_min, ideal_max, col
         height=200
     )
     
-    return chart
+    with alt.data_transformers.enable(consolidate_datasets=False):
+        return chart.to_dict()
+
+def create_individual_plot(df, metric, title, y_label, ideal_min, ideal_max, color):
+    """Draw an individual plot with shaded ideal range; extend it later with add_rows"""
+    spec = dict(_chart_spec(metric, title, y_label, ideal_min, ideal_max, color))
+    spec["datasets"] = {HISTORY_DATASET: df}
+    return st.vega_lite_chart(spec, use_container_width=True)
+
+def append_to_plot(chart, new_rows):
+    """Stream new rows into a chart drawn by create_individual_plot"""
+    chart.add_rows(**{HISTORY_DATASET: new_rows})
+
+# Session store columns behind each overview chart
+OVERVIEW_METRICS = {
+    'Pitch (Hz)': ('pitch_mean', '🎵 Pitch (session overview)', IDEAL_PITCH_MIN, IDEAL_PITCH_MAX, '#1f77b4'),
+    'Loudness (RMS)': ('rms_mean', '🔊 Loudness (session overview)', IDEAL_RMS_MIN, IDEAL_RMS_MAX, '#ff7f0e'),
+    'Tempo (BPM)': ('tempo', '⏱️ Tempo (session overview)', IDEAL_TEMPO_MIN, IDEAL_TEMPO_MAX, '#2ca02c'),
+}
+
+def draw_session_overview(session_path, range_seconds):
+    """Draw the recorded session (or its last `range_seconds`) with a bounded number of points per chart"""
+    columns = load_session(session_path) # Memory-mapped, only the selected range is read
+    times = columns['time']
+    if len(times) == 0:
+        st.info("The session overview appears once the first block of results is saved.")
+        return
+    start = None if range_seconds is None else float(times[-1]) - range_seconds
+    for metric, (column, title, ideal_min, ideal_max, color) in OVERVIEW_METRICS.items():
+        # Each series is decimated on its own, so every chart keeps its own peaks
+        series = decimated_range({'time': times, column: columns[column]}, 'time', start=start)
+        series = series.rename(columns={'time': 'Time (s)', column: metric})
+        create_individual_plot(series, metric, title, metric, ideal_min, ideal_max, color)
+    st.caption(f"{len(times)} results recorded; each chart shows at most {MAX_CHART_POINTS} points "
+               "(largest-triangle-three-buckets). Pick a shorter range for full detail.")
 
 # --- Streamlit UI ---
 st.title("🎙️ Live Pitch and Tone Analyzer")
@@ -276,64 +115,115 @@ st.info("Allow microphone access if prompted. Speak clearly into your microphone
 
 placeholder = st.empty()
 
+# The full-session overview lives outside the redrawn placeholder, so its range
+# picker is created once per script run
+with st.expander("🗂️ Full session overview"):
+    overview_range = st.select_slider("Time range", options=list(overview_ranges), value="Whole session")
+    overview_area = st.empty()
+
 # Initialize session state for storing historical data for plotting
 if 'feature_history' not in st.session_state:
-    st.session_state.feature_history = pd.DataFrame(columns=['Time (s)', 'Pitch (Hz)', 'Loudness (RMS)', 'Tempo (BPM)'])
+    # Sized for the displayed window at the fastest update rate, plus slack
+    st.session_state.feature_history = FeatureHistory(
+        ['Time (s)', 'Pitch (Hz)', 'Loudness (RMS)', 'Tempo (BPM)'],
+        capacity=int(max_history_seconds / min(update_hop, duration)) + 8
+    )
+# Every analysed chunk of the session is also kept on disk for the final report;
+# writes happen in blocks on a background thread. The embedding page names the
+# recording (?vocal_session=<id>) and sends the same id with its report request
+if 'session_writer' not in st.session_state:
+    vocal_session = st.query_params.get("vocal_session")
+    st.session_state.session_writer = SessionWriter(vocal_session if valid_session_id(vocal_session) else None)
+    # Write the last partial block when the app shuts down
+    atexit.register(st.session_state.session_writer.close, timeout=5)
 if 'current_time_s' not in st.session_state:
     st.session_state.current_time_s = 0
+# Microphone capture runs in the sounddevice callback thread, so audio keeps
+# being recorded while a chunk is analysed and rendered
+if 'capture' not in st.session_state:
+    st.session_state.capture = MicrophoneCapture(sr, buffer_seconds=capture_buffer_seconds)
+# Feature extraction runs in worker processes; the script thread only
+# captures, collects finished results and renders
+if 'workers' not in st.session_state:
+    st.session_state.workers = FeatureWorkerPool(
+        sr, max_pending=analysis_max_pending, incremental=incremental,
+        window_seconds=duration, hop_seconds=update_hop,
+        fast_window_seconds=fast_window, slow_hop_seconds=slow_update_hop
+    )
+    # The workers import and JIT-compile the analyser before capturing, so the
+    # first feedback is as fast as the rest (this page never imports librosa)
+    with st.spinner("Warming up the vocal analyser..."):
+        st.session_state.workers.wait_ready()
+
+if incremental:
+    step = aligned_hop_samples(sr, update_hop) / sr
+else:
+    step = duration
+last_audio_time = time.time()
+charts = None # Chart elements currently on the page, extended with add_rows
+charts_start_s = 0
+overview_rows = None # Session rows on disk when the overview was last drawn
+
+with placeholder.container():
+    st.info("Start speaking to see vocal metrics over time!") 
 
 # Continuous loop - runs indefinitely
 while True:
     try:
-        # Record audio for `duration` seconds
-        audio = sd.rec(int(duration * sr), samplerate=sr, channels=1, dtype='float32')
-        sd.wait() # Wait for the recording to finish
+        st.session_state.capture.start() # No-op while the stream is running
+
+        # Hand every complete hop/window to the workers without waiting for its analysis
+        chunk = st.session_state.capture.read_chunk(int(round(step * sr)), timeout=0.1)
+        if chunk is not None:
+            # Non-finite values (NaNs, Infs) from sounddevice are cleaned once, by the analyser
+            st.session_state.workers.submit(chunk, st.session_state.current_time_s)
+            st.session_state.current_time_s += step # Increment time for next chunk
+            last_audio_time = time.time()
+        elif time.time() - last_audio_time > duration * 2:
+            raise RuntimeError("No audio received from the microphone")
+
+        # Redraw the overview whenever the writer thread has put a new block on disk
+        # (at least every FLUSH_SECONDS while recording), independently of the live charts
+        if st.session_state.session_writer.written != overview_rows:
+            overview_rows = st.session_state.session_writer.written
+            with overview_area.container():
+                draw_session_overview(st.session_state.session_writer.path, overview_ranges[overview_range])
+
+        results = st.session_state.workers.poll()
+        if not results:
+            continue # Nothing new to draw yet
+
+        for timestamp, features, alerts in results:
+            # Create new row data
+            new_data = {
+                'Time (s)': timestamp,
+                'Pitch (Hz)': features['pitch_mean'],
+                'Loudness (RMS)': features['rms_mean'],
+                'Tempo (BPM)': features['tempo']
+            }
+            
+            st.session_state.feature_history.append(new_data)
+            st.session_state.session_writer.append(timestamp, features)
+
+        new_rows = st.session_state.feature_history.to_frame(start_time=results[0][0])
+
+        # The page and its charts are drawn once and then only extended; they are
+        # redrawn from the last N seconds of data once they hold twice that much
+        if charts is None or st.session_state.current_time_s - charts_start_s >= 2 * max_history_seconds:
+            charts_start_s = st.session_state.current_time_s - max_history_seconds
+            chart_data = st.session_state.feature_history.to_frame(start_time=charts_start_s)
+
+            with placeholder.container():
+                st.subheader("📊 Live Vocal Analysis")
 
-        chunk = audio.flatten()
-        
-        # Apply fix for non-finite values (NaNs, Infs) that might come from sounddevice
-        if not np.isfinite(chunk).all():
-            chunk = np.nan_to_num(chunk, nan=0.0, posinf=0.0, neginf=0.0)
-
-        features = extract_features(chunk, sr)
-        alerts = analyze_speech(features)
-
-        # Create new row data
-        new_data = {
-            'Time (s)': st.session_state.current_time_s,
-            'Pitch (Hz)': features['pitch_mean'],
-            'Loudness (RMS)': features['rms_mean'],
-            'Tempo (BPM)': features['tempo']
-        }
-        
-        # Fix for pandas concatenation warning - check if dataframe is empty first
-        if st.session_state.feature_history.empty:
-            st.session_state.feature_history = pd.DataFrame([new_data])
-        else:
-            new_row = pd.DataFrame([new_data])
-            st.session_state.feature_history = pd.concat([st.session_state.feature_history, new_row], ignore_index=True)
-        
-        st.session_state.current_time_s += duration # Increment time for next chunk
-
-        # Keep only the last N seconds of data for a moving window effect
-        max_history_seconds = 30 # Display last 30 seconds of data
-        st.session_state.feature_history = st.session_state.feature_history[
-            st.session_state.feature_history['Time (s)'] >= (st.session_state.current_time_s - max_history_seconds)
-        ]
-
-        with placeholder.container():
-            st.subheader("📊 Live Vocal Analysis")
-
-            if not st.session_state.feature_history.empty:
                 # PITCH SECTION
                 st.markdown("### 🎵 Pitch Analysis")
                 pitch_col1, pitch_col2 = st.columns([1, 3])
                 with pitch_col1:
-                    st.write(f"**Pitch (Mean):** {features['pitch_mean']:.1f} Hz")
-                    st.write(f"**Pitch (Std Dev):** {features['pitch_std']:.1f} Hz")
+                    pitch_text = st.empty()
                 with pitch_col2:
                     pitch_chart = create_individual_plot(
-                        st.session_state.feature_history, 
+                        chart_data, 
                         'Pitch (Hz)', 
                         '🎵 Pitch Analysis',
                         'Pitch (Hz)', 
@@ -341,9 +231,7 @@ while True:
                         IDEAL_PITCH_MAX, 
                         '#1f77b4'
                     )
-                    if pitch_chart:
-                        st.altair_chart(pitch_chart, use_container_width=True)
-                        st.caption("Green shaded area represents ideal pitch range for public speaking (100-250 Hz)")
+                    st.caption("Green shaded area represents ideal pitch range for public speaking (100-250 Hz)")
 
                 st.markdown("---")
 
@@ -351,10 +239,10 @@ while True:
                 st.markdown("### 🔊 Loudness Analysis")
                 loud_col1, loud_col2 = st.columns([1, 3])
                 with loud_col1:
-                    st.write(f"**Loudness (RMS):** {features['rms_mean']:.3f}")
+                    loud_text = st.empty()
                 with loud_col2:
                     loudness_chart = create_individual_plot(
-                        st.session_state.feature_history, 
+                        chart_data, 
                         'Loudness (RMS)', 
                         '🔊 Loudness Analysis',
                         'Loudness (RMS)', 
@@ -362,9 +250,7 @@ while True:
                         IDEAL_RMS_MAX, 
                         '#ff7f0e'
                     )
-                    if loudness_chart:
-                        st.altair_chart(loudness_chart, use_container_width=True)
-                        st.caption("Green shaded area represents ideal loudness range for public speaking (0.03-0.12 RMS)")
+                    st.caption("Green shaded area represents ideal loudness range for public speaking (0.03-0.12 RMS)")
 
                 st.markdown("---")
 
@@ -372,10 +258,10 @@ while True:
                 st.markdown("### ⏱️ Tempo Analysis")
                 tempo_col1, tempo_col2 = st.columns([1, 3])
                 with tempo_col1:
-                    st.write(f"**Tempo:** {features['tempo']:.1f} BPM")
+                    tempo_text = st.empty()
                 with tempo_col2:
                     tempo_chart = create_individual_plot(
-                        st.session_state.feature_history, 
+                        chart_data, 
                         'Tempo (BPM)', 
                         '⏱️ Tempo Analysis',
                         'Tempo (BPM)', 
@@ -383,29 +269,57 @@ while True:
                         IDEAL_TEMPO_MAX, 
                         '#2ca02c'
                     )
-                    if tempo_chart:
-                        st.altair_chart(tempo_chart, use_container_width=True)
-                        st.caption("Green shaded area represents ideal speaking tempo for public speaking (120-150 BPM)")
+                    st.caption("Green shaded area represents ideal speaking tempo for public speaking (120-150 BPM)")
 
                 st.markdown("---")
 
-            else:
-                st.info("Start speaking to see vocal metrics over time!") 
+                # ALERTS SECTION — at the end, below everything
+                st.subheader("🗣️ Vocal Feedback")
+                alerts_area = st.empty()
 
-            # ALERTS SECTION — at the end, below everything
-            st.subheader("🗣️ Vocal Feedback")
+                # DEBUG SECTION — per-stage analyser timings (VOCAL_TIMING=1)
+                if timing_enabled():
+                    with st.expander("🛠️ Analyzer stage timings (debug)"):
+                        timing_area = st.empty()
+
+            charts = (pitch_chart, loudness_chart, tempo_chart)
+        else:
+            for chart in charts:
+                append_to_plot(chart, new_rows)
+
+        pitch_text.markdown(
+            f"**Pitch (Mean):** {features['pitch_mean']:.1f} Hz  \n"
+            f"**Pitch (Std Dev):** {features['pitch_std']:.1f} Hz"
+        )
+        loud_text.markdown(f"**Loudness (RMS):** {features['rms_mean']:.3f}")
+        tempo_text.markdown(f"**Tempo:** {features['tempo']:.1f} BPM")
+
+        with alerts_area.container():
             if alerts:
                 for item in alerts:
                     st.warning(item)
             else:
                 st.success("✨ Your vocal delivery sounds great in this segment!")
+
+        if timing_enabled():
+            stage_stats = st.session_state.workers.stage_stats
+            with timing_area.container():
+                st.caption(f"Rolling percentiles over the last {stage_stats.window} chunks; "
+                           f"{st.session_state.workers.dropped} chunk(s) dropped so far")
+                if stage_stats.chunks:
+                    st.dataframe(stage_stats.to_frame())
     
         
         # Add a small sleep to prevent the loop from consuming too much CPU unnecessarily
         # This is particularly important for Streamlit's reruns
-        time.sleep(0.1) # You can uncomment and adjust this if UI becomes unresponsive, though sd.wait() already blocks
+        time.sleep(0.1) # You can uncomment and adjust this if UI becomes unresponsive, though read_chunk() already blocks
 
     except Exception as e:
+        # Reopen the input stream on the next iteration
+        st.session_state.capture.stop()
+        st.session_state.session_writer.flush() # Nothing more is recorded until capture resumes
+        last_audio_time = time.time()
+        charts = None # The error message replaces the charts, so redraw them next time
         # If there's an error, display it in the Streamlit app and continue
         with placeholder.container():
             st.error(f"Error in processing audio: {e}")
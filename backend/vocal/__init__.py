@@ -0,0 +1,39 @@
+"""
+Headless vocal analysis engine.
+
+Importable without Streamlit or an audio device, so the live UI, the FastAPI
+backend and offline tools share one implementation:
+
+    from vocal import analyze_batch, analyze_chunk, analyze_chunks, analyze_stream
+
+The analysis functions are resolved on first access, so light submodules
+(vocal.config, vocal.capture, vocal.warmup, ...) can be imported without
+paying for librosa and numba; see vocal.warmup for loading them ahead of time.
+"""
+import importlib
+
+from vocal.config import CHUNK_SECONDS, SAMPLE_RATE
+
+_LAZY_EXPORTS = {
+    "analyze_batch": "vocal.engine",
+    "analyze_chunk": "vocal.engine",
+    "analyze_chunks": "vocal.engine",
+    "analyze_stream": "vocal.engine",
+    "analyze_speech": "vocal.features",
+    "extract_features": "vocal.features",
+    "extract_features_batch": "vocal.features",
+    "SlidingWindowAnalyzer": "vocal.stream",
+    "FeatureRecord": "vocal.record",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module 'vocal' has no attribute '{name}'")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
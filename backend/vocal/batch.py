@@ -0,0 +1,146 @@
+"""
+Offline re-scoring of recorded sessions.
+
+Long recordings are read one chunk at a time (never loaded whole) and scored
+with the same extract_features/analyze_speech as the live analyser. Chunks
+from every file share one process pool, so a multi-core box works on several
+files and several chunks at once.
+
+    python -m vocal.batch recordings/*.wav --out results/
+"""
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+from vocal.config import CHUNK_SECONDS, SAMPLE_RATE
+from vocal.engine import analyze_chunk
+from vocal.resample import StreamingResampler
+from vocal.rules import alert_counts
+
+# Scalar metrics reported per chunk and aggregated per session
+METRICS = [
+    "pitch_mean", "pitch_std", "rms_mean", "zcr_mean", "tempo",
+    "spectral_centroid", "spectral_bandwidth", "chroma_mean", "speech_ratio",
+]
+
+
+# --- Chunked Reading ---
+def iter_chunks(path, chunk_seconds=CHUNK_SECONDS, sr=SAMPLE_RATE):
+    """
+    Yield (start_seconds, mono float32 chunk at `sr`) from an audio file.
+
+    Only about one chunk is held in memory at a time; a trailing partial
+    chunk is included. Files recorded at another rate go through one
+    streaming resampler, so chunk boundaries are seamless.
+    """
+    chunk_samples = int(round(chunk_seconds * sr))
+    with sf.SoundFile(path) as f:
+        resampler = StreamingResampler(f.samplerate, sr)
+        block = int(round(chunk_seconds * f.samplerate))
+        pending = np.zeros(0, dtype=np.float32)
+        position = 0
+        finished = False
+        while not finished:
+            data = f.read(block, dtype='float32', always_2d=True)
+            finished = len(data) == 0
+            mono = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+            pending = np.concatenate([pending, resampler.process(mono, last=finished)])
+            while len(pending) >= chunk_samples or (finished and len(pending) > 0):
+                chunk, pending = pending[:chunk_samples], pending[chunk_samples:]
+                yield position / sr, chunk
+                position += len(chunk)
+
+
+def _score_chunk(chunk, sr):
+    features, alerts = analyze_chunk(chunk, sr, copy=False) # Worker-side copy, sanitised in place
+    row = {metric: features[metric] for metric in METRICS}
+    for i, value in enumerate(features["mfccs"]):
+        row[f"mfcc_{i + 1}"] = value
+    row["n_alerts"] = len(alerts)
+    row["alerts"] = " | ".join(alerts)
+    return row
+
+
+# --- Batch Analysis ---
+def analyze_files(paths, sr=SAMPLE_RATE, chunk_seconds=CHUNK_SECONDS, max_workers=None):
+    """
+    Score every chunk of every file and return the per-chunk feature table.
+
+    Columns: file, start_s, end_s, the METRICS, mfcc_1..13, n_alerts and alerts.
+    At most two chunks per worker are in flight, so memory stays bounded
+    however long the recordings are.
+    """
+    rows = []
+    max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+
+        def collect_oldest():
+            path, start, end, future = in_flight.popleft()
+            rows.append({"file": path, "start_s": start, "end_s": end, **future.result()})
+
+        for path in paths:
+            for start, chunk in iter_chunks(path, chunk_seconds=chunk_seconds, sr=sr):
+                if len(in_flight) >= max_in_flight:
+                    collect_oldest()
+                in_flight.append((path, start, start + len(chunk) / sr, executor.submit(_score_chunk, chunk, sr)))
+        while in_flight:
+            collect_oldest()
+
+    return pd.DataFrame(rows, columns=["file", "start_s", "end_s", *METRICS, *[f"mfcc_{i + 1}" for i in range(13)], "n_alerts", "alerts"])
+
+
+def summarize_sessions(table):
+    """
+    Aggregate a per-chunk table into one row per file.
+
+    Metric means skip chunks where the metric was not detected (0.0), so
+    pauses do not drag down pitch or tempo; `silent_fraction` reports how
+    much of the session had no measurable loudness. `alerts_<rule>` counts
+    the chunks that triggered each alert rule.
+    """
+    rule_counts = alert_counts(table, by="file")
+    summaries = []
+    for path, chunks in table.groupby("file", sort=False):
+        summary = {
+            "file": path,
+            "chunks": len(chunks),
+            "duration_s": float(chunks["end_s"].max()),
+            "silent_fraction": float((chunks["rms_mean"] <= 0).mean()),
+            "total_alerts": int(chunks["n_alerts"].sum()),
+        }
+        for metric in METRICS:
+            values = chunks[metric].to_numpy(dtype=np.float64)
+            detected = values[values > 0]
+            summary[f"{metric}_mean"] = float(detected.mean()) if len(detected) else 0.0
+            summary[f"{metric}_std"] = float(detected.std()) if len(detected) else 0.0
+        for rule_id, count in rule_counts.loc[path].items():
+            summary[f"alerts_{rule_id}"] = int(count)
+        summaries.append(summary)
+    return pd.DataFrame(summaries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score recorded rehearsal sessions offline.")
+    parser.add_argument("paths", nargs="+", help="audio files to analyse (WAV, FLAC, OGG, ...)")
+    parser.add_argument("--out", default=".", help="directory for the CSV reports")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-seconds", type=float, default=CHUNK_SECONDS)
+    args = parser.parse_args()
+
+    table = analyze_files(args.paths, chunk_seconds=args.chunk_seconds, max_workers=args.workers)
+    os.makedirs(args.out, exist_ok=True)
+    for path, chunks in table.groupby("file", sort=False):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        chunks.to_csv(os.path.join(args.out, f"{stem}_chunks.csv"), index=False)
+    summarize_sessions(table).to_csv(os.path.join(args.out, "sessions.csv"), index=False)
+    print(f"Analysed {len(table)} chunks from {len(args.paths)} file(s) into {args.out}")
+
+
+if __name__ == "__main__":
+    main()
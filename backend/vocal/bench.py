@@ -0,0 +1,207 @@
+"""
+Benchmark suite for the vocal feature extractor.
+
+Runs headless (no audio device) on deterministic synthetic fixtures, times
+each feature stage separately and reports throughput in audio-seconds per
+CPU-second. Compare against a saved baseline to fail CI on regressions:
+
+    python -m vocal.bench --json bench.json
+    python -m vocal.bench --baseline bench.json --max-regression 0.25
+
+`--memory` instead reports the peak memory the input preprocessing and a
+full extraction allocate per chunk.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import librosa
+
+from vocal.features import extract_features
+from vocal.fixtures import FIXTURES, synthetic_audio
+from vocal.pitch import pyin_f0, yin_f0
+from vocal.preprocess import prepare_audio
+from vocal.spectral import N_MFCC, compute_spectrogram, estimate_tempo, frame_sizes, spectral_plan
+from vocal.multires import MultiResolutionAnalyzer
+from vocal.stream import SlidingWindowAnalyzer
+
+DURATIONS = [1, 3, 10]
+SAMPLE_RATES = [16000, 22050, 44100]
+
+
+def _prepare(audio):
+    """Sanitise like extract_features so individual stages see valid input."""
+    return prepare_audio(audio, out=np.empty(len(audio), dtype=np.float32))
+
+
+def _prepare_copying(audio):
+    """The copy-per-step sanitising chain prepare_audio replaces, for comparison."""
+    audio = np.nan_to_num(audio, nan=0.0, posinf=0.0, neginf=0.0)
+    return np.clip(audio.astype(np.float32), -1.0, 1.0)
+
+
+def _incremental(audio, sr, analyzer_cls=SlidingWindowAnalyzer):
+    analyzer = analyzer_cls(sr)
+    for start in range(0, len(audio) - analyzer.hop_samples + 1, analyzer.hop_samples):
+        analyzer.push(audio[start:start + analyzer.hop_samples])
+
+
+def _stages(audio, sr):
+    """Stage name -> zero-argument callable. Spectral stages reuse one precomputed STFT."""
+    n_fft, hop_length = frame_sizes(sr)
+    plan = spectral_plan(sr)
+    magnitude, power = compute_spectrogram(audio, sr)
+    log_mel = librosa.power_to_db(plan.melspectrogram(power))
+    return {
+        "stft": lambda: compute_spectrogram(audio, sr),
+        "rms": lambda: librosa.feature.rms(y=audio, frame_length=n_fft, hop_length=hop_length),
+        "zcr": lambda: librosa.feature.zero_crossing_rate(y=audio, frame_length=n_fft, hop_length=hop_length),
+        "mfcc": lambda: librosa.feature.mfcc(S=librosa.power_to_db(plan.melspectrogram(power)), n_mfcc=N_MFCC),
+        "centroid": lambda: librosa.feature.spectral_centroid(S=magnitude, sr=sr),
+        "bandwidth": lambda: librosa.feature.spectral_bandwidth(S=magnitude, sr=sr),
+        "chroma": lambda: plan.chroma(power),
+        "tempo": lambda: estimate_tempo(log_mel, sr),
+        "pitch_pyin": lambda: pyin_f0(audio, sr),
+        "pitch_yin": lambda: yin_f0(audio, sr),
+        "incremental": lambda: _incremental(audio, sr),
+        "multires": lambda: _incremental(audio, sr, MultiResolutionAnalyzer),
+    }
+
+
+def _time(fn, repeats):
+    """Median (wall, cpu) seconds over `repeats` runs after one warm-up call."""
+    fn()
+    wall, cpu = [], []
+    for _ in range(repeats):
+        w0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        wall.append(time.perf_counter() - w0)
+        cpu.append(time.process_time() - c0)
+    return float(np.median(wall)), float(np.median(cpu))
+
+
+def run_benchmarks(fixtures=FIXTURES, durations=DURATIONS, sample_rates=SAMPLE_RATES, repeats=3, stages=None):
+    """Return one result dict per (fixture, duration, sr, stage)."""
+    results = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for sr in sample_rates:
+            for duration in durations:
+                for kind in fixtures:
+                    raw = synthetic_audio(kind, duration, sr)
+                    audio = _prepare(raw)
+                    cases = {"extract_features": lambda: extract_features(raw, sr), **_stages(audio, sr)}
+                    for stage, fn in cases.items():
+                        if stages and stage not in stages:
+                            continue
+                        result = {"fixture": kind, "duration": duration, "sr": sr, "stage": stage}
+                        try:
+                            wall, cpu = _time(fn, repeats)
+                            result.update(wall_s=wall, cpu_s=cpu, throughput=duration / max(cpu, 1e-9))
+                        except Exception as e:
+                            result.update(error=str(e))
+                        results.append(result)
+    return results
+
+
+def _peak_bytes(setup, fn):
+    """Peak bytes allocated by fn(setup()) according to tracemalloc; setup runs untraced."""
+    fn(setup()) # Warm-up: scratch buffers, caches, lazy imports
+    arg = setup()
+    tracemalloc.start()
+    try:
+        fn(arg)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_memory(fixtures=FIXTURES, durations=DURATIONS, sample_rates=SAMPLE_RATES):
+    """Return one result dict per (fixture, duration, sr, path) with the peak bytes allocated."""
+    results = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for sr in sample_rates:
+            for duration in durations:
+                for kind in fixtures:
+                    raw = synthetic_audio(kind, duration, sr)
+                    scratch = np.empty(len(raw), dtype=np.float32)
+                    paths = {
+                        "prepare_copying": (lambda: raw, _prepare_copying),
+                        "prepare_reused": (lambda: raw, lambda a: prepare_audio(a, out=scratch)),
+                        "prepare_in_place": (raw.copy, prepare_audio),
+                        "extract_features": (lambda: raw, lambda a: extract_features(a, sr)),
+                        "extract_in_place": (raw.copy, lambda a: extract_features(a, sr, copy=False)),
+                    }
+                    for path, (setup, fn) in paths.items():
+                        results.append({"fixture": kind, "duration": duration, "sr": sr, "path": path,
+                                        "peak_bytes": _peak_bytes(setup, fn), "chunk_bytes": raw.nbytes})
+    return results
+
+
+def _key(result):
+    return (result["fixture"], result["duration"], result["sr"], result["stage"])
+
+
+def find_regressions(results, baseline, max_regression):
+    """Cases whose throughput fell by more than `max_regression` (a fraction) versus `baseline`."""
+    previous = {_key(r): r for r in baseline if "throughput" in r}
+    regressions = []
+    for result in results:
+        before = previous.get(_key(result))
+        if before is None:
+            continue
+        if "throughput" not in result or result["throughput"] < before["throughput"] * (1 - max_regression):
+            regressions.append((result, before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vocal feature extractor on synthetic audio.")
+    parser.add_argument("--fixtures", nargs="+", default=FIXTURES, choices=FIXTURES)
+    parser.add_argument("--durations", nargs="+", type=float, default=DURATIONS)
+    parser.add_argument("--sample-rates", nargs="+", type=int, default=SAMPLE_RATES)
+    parser.add_argument("--stages", nargs="+", default=None, help="only run these stages")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed throughput drop (fraction)")
+    parser.add_argument("--memory", action="store_true", help="report peak allocations per chunk instead of timings")
+    args = parser.parse_args()
+
+    if args.memory:
+        print(f"{'fixture':<9} {'dur':>5} {'sr':>6} {'path':<17} {'peak KiB':>10} {'x chunk':>8}")
+        for r in measure_memory(args.fixtures, args.durations, args.sample_rates):
+            print(f"{r['fixture']:<9} {r['duration']:>5g} {r['sr']:>6} {r['path']:<17} "
+                  f"{r['peak_bytes'] / 1024:>10.1f} {r['peak_bytes'] / r['chunk_bytes']:>8.2f}")
+        return
+
+    results = run_benchmarks(args.fixtures, args.durations, args.sample_rates, args.repeats, args.stages)
+
+    print(f"{'fixture':<9} {'dur':>5} {'sr':>6} {'stage':<17} {'wall ms':>9} {'cpu ms':>9} {'audio-s/cpu-s':>14}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['fixture']:<9} {r['duration']:>5g} {r['sr']:>6} {r['stage']:<17} error: {r['error']}")
+        else:
+            print(f"{r['fixture']:<9} {r['duration']:>5g} {r['sr']:>6} {r['stage']:<17} "
+                  f"{r['wall_s'] * 1000:>9.1f} {r['cpu_s'] * 1000:>9.1f} {r['throughput']:>14.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.max_regression)
+        for result, before in regressions:
+            print(f"REGRESSION {_key(result)}: {before['throughput']:.1f} -> {result.get('throughput', 0):.1f} audio-s/cpu-s")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
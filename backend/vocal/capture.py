@@ -0,0 +1,150 @@
+import threading
+
+import numpy as np
+
+from vocal.resample import StreamingResampler
+
+
+# --- Ring Buffer ---
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 ring buffer of mono audio samples.
+
+    A single producer (the audio callback) writes while a single consumer
+    (the analysis loop) reads complete windows. If the consumer falls more
+    than `capacity` samples behind, the oldest unread audio is overwritten and
+    counted in `dropped_samples`.
+    """
+
+    def __init__(self, capacity):
+        self._buffer = np.zeros(int(capacity), dtype=np.float32)
+        self._capacity = int(capacity)
+        self._written = 0 # Total samples ever written
+        self._read = 0    # Total samples ever consumed
+        self._cond = threading.Condition()
+        self.dropped_samples = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def available(self):
+        """Number of samples written but not yet read."""
+        with self._cond:
+            return self._written - self._read
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self._capacity: # Only the newest `capacity` samples can be kept
+            samples = samples[-self._capacity:]
+        with self._cond:
+            start = (self._written + n - len(samples)) % self._capacity
+            first = min(len(samples), self._capacity - start)
+            self._buffer[start:start + first] = samples[:first]
+            self._buffer[:len(samples) - first] = samples[first:]
+            self._written += n
+            overflow = self._written - self._read - self._capacity
+            if overflow > 0:
+                self.dropped_samples += overflow
+                self._read += overflow
+            self._cond.notify_all()
+
+    def _copy_out(self, start, n, out):
+        begin = start % self._capacity
+        first = min(n, self._capacity - begin)
+        out[:first] = self._buffer[begin:begin + first]
+        out[first:n] = self._buffer[:n - first]
+        return out
+
+    def read(self, n, timeout=None, out=None):
+        """
+        Consume the next `n` samples, blocking until they are available.
+
+        Returns None if `timeout` (seconds) expires first. Pass `out` to fill a
+        preallocated float32 array instead of allocating a new one.
+        """
+        if n > self._capacity:
+            raise ValueError(f"Cannot read {n} samples from a buffer of {self._capacity}")
+        if out is None:
+            out = np.empty(n, dtype=np.float32)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._written - self._read >= n, timeout=timeout):
+                return None
+            self._copy_out(self._read, n, out)
+            self._read += n
+        return out[:n]
+
+    def clear(self):
+        with self._cond:
+            self._read = self._written
+
+
+# --- Microphone Capture ---
+class MicrophoneCapture:
+    """
+    Gapless microphone capture through a sounddevice.InputStream callback.
+
+    The callback only copies each block into the ring buffer, so recording
+    continues while the analysis loop is busy; the loop pulls complete
+    windows with `read_chunk`.
+
+    The device records at its own rate (`device_sr`, by default the input
+    device's native rate) and the callback resamples each block once to the
+    analysis rate `sr`, so the buffer and everything downstream only ever
+    hold analysis-rate samples.
+    """
+
+    def __init__(self, sr, buffer_seconds=30, channels=1, device=None, device_sr=None):
+        self.sr = sr
+        self.device_sr = device_sr
+        self.channels = channels
+        self.device = device
+        self.buffer = AudioRingBuffer(int(sr * buffer_seconds))
+        self.status_errors = 0 # Over/underflows reported by PortAudio
+        self._stream = None
+        self._resampler = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            self.status_errors += 1
+        block = indata[:, 0] if indata.shape[1] == 1 else indata.mean(axis=1)
+        self.buffer.write(self._resampler.process(block))
+
+    @property
+    def active(self):
+        return self._stream is not None and self._stream.active
+
+    def start(self):
+        if self.active:
+            return
+        import sounddevice as sd # Only needed when a real device is opened
+
+        device_sr = self.device_sr
+        if device_sr is None:
+            device_sr = int(sd.query_devices(self.device, 'input')['default_samplerate'])
+        self._resampler = StreamingResampler(device_sr, self.sr)
+        self._stream = sd.InputStream(
+            samplerate=device_sr, channels=self.channels, dtype='float32',
+            device=self.device, callback=self._callback
+        )
+        self._stream.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def read_chunk(self, n_samples, timeout=None, out=None):
+        """Block until `n_samples` new samples are captured and return them."""
+        return self.buffer.read(n_samples, timeout=timeout, out=out)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
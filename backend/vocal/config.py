@@ -0,0 +1,73 @@
+import os
+import warnings
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# --- Audio Configuration ---
+# Rate every analysis stage runs at; capture at the device rate is resampled
+# to it once
+SAMPLE_RATE = int(os.getenv("VOCAL_SAMPLE_RATE", "22050"))
+CHUNK_SECONDS = 3 # seconds per analysed audio chunk
+
+# Frame and hop lengths are given in samples at this rate and scaled to the
+# analysis rate, so every stage keeps the same time/frequency resolution.
+# The alert thresholds were tuned at this rate too: spectral centroid,
+# bandwidth and ZCR depend on the analysed band (at 16000 Hz the centroid of
+# the same voice drops by about a third), so the muffled, thin and sibilance
+# alerts only mean what they say here
+REFERENCE_SAMPLE_RATE = 22050
+if SAMPLE_RATE != REFERENCE_SAMPLE_RATE:
+    warnings.warn(f"VOCAL_SAMPLE_RATE={SAMPLE_RATE}: the spectral and ZCR alert thresholds are tuned "
+                  f"at {REFERENCE_SAMPLE_RATE} Hz and will fire differently at this rate")
+
+def scale_frames(frame_length, hop_length, sr):
+    """Scale a (frame, hop) pair given at REFERENCE_SAMPLE_RATE to `sr`, keeping their durations."""
+    hop = max(int(round(hop_length * sr / REFERENCE_SAMPLE_RATE)), 1)
+    return hop * frame_length // hop_length, hop
+
+# --- STFT Configuration (matches librosa's feature defaults at 22050 Hz) ---
+N_FFT = 2048
+HOP_LENGTH = 512
+
+def aligned_hop_samples(sr, hop_seconds):
+    """Round an update hop to whole STFT hops so frames line up across pushes."""
+    hop_length = scale_frames(N_FFT, HOP_LENGTH, sr)[1]
+    return max(int(round(hop_seconds * sr / hop_length)), 1) * hop_length
+
+# --- Feature Schema ---
+N_MFCC = 13 # MFCC coefficients summarised per chunk
+
+# --- Voice Activity Thresholds ---
+SPEECH_RMS = 0.01          # Frame RMS (~-40 dBFS) below which a frame is pause/room noise
+MAX_SPEECH_ZCR = 0.35      # Broadband hiss crosses zero far more often than a voice
+MIN_SPEECH_FRACTION = 0.1  # Chunks with less speech than this are reported as silence
+MIN_TEMPO_SPEECH_FRACTION = 0.3  # Mostly-pause chunks give no usable speaking rate
+
+# --- Helper for Normalization ---
+def normalize_feature(value, min_val, max_val):
+    """Normalize a value to the range [0, 1] given min and max possible values."""
+    if max_val == min_val: # Avoid division by zero, return midpoint
+        return 0.5
+    return (value - min_val) / (max_val - min_val)
+
+# --- Define expected min/max for normalization (adjust as needed) ---
+# These are rough estimates; you might fine-tune them based on typical vocal ranges.
+MIN_PITCH = 50   # Hz (for very low voices, e.g., male fundamental)
+MAX_PITCH = 400  # Hz (for relatively high voices, e.g., female fundamental)
+
+MIN_RMS = 0.001  # A very quiet sound
+MAX_RMS = 0.25   # A loud sound (can go higher but this keeps typical speech visible)
+
+MIN_TEMPO = 60   # BPM (very slow speaking)
+MAX_TEMPO = 200  # BPM (very fast speaking)
+
+# --- Define ideal ranges for public speaking ---
+IDEAL_PITCH_MIN = 100  # Hz - lower bound of ideal pitch range
+IDEAL_PITCH_MAX = 250  # Hz - upper bound of ideal pitch range
+
+IDEAL_RMS_MIN = 0.03   # lower bound of ideal loudness
+IDEAL_RMS_MAX = 0.12   # upper bound of ideal loudness
+
+IDEAL_TEMPO_MIN = 120  # BPM - lower bound of ideal speaking tempo
+IDEAL_TEMPO_MAX = 150  # BPM - upper bound of ideal speaking tempo
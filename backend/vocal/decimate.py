@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# Points a chart is given per series, however long the session
+MAX_CHART_POINTS = 500
+
+
+# --- Series Decimation ---
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the `n_out` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket, which preserves peaks and
+    the visual shape of the line. Series with at most `n_out` points are
+    returned whole.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("LTTB keeps at least 3 points (the two ends and one bucket)")
+
+    # Bucket boundaries over the interior points 1..n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean of every bucket, for the "next bucket" vertex of each triangle
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        # Twice the triangle area for every candidate in this bucket
+        area = np.abs((x[previous] - mean_x[b + 1]) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (mean_y[b + 1] - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept[b + 1] = previous
+    return kept
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Indices of the minimum and maximum of each of `n_buckets` equal buckets
+    (at most 2 * n_buckets points, in order). Cheaper than LTTB and keeps
+    every extreme, e.g. loudness spikes.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    width = int(np.max(np.diff(edges)))
+    # Pad every bucket to the same width so all of them are reduced in one call
+    index = np.minimum(edges[:-1, None] + np.arange(width), edges[1:, None] - 1)
+    values = y[index]
+    lows = index[np.arange(n_buckets), np.argmin(values, axis=1)]
+    highs = index[np.arange(n_buckets), np.argmax(values, axis=1)]
+    return np.unique(np.concatenate([lows, highs]))
+
+
+def decimate_frame(frame, x, columns, max_points=MAX_CHART_POINTS, method="lttb"):
+    """
+    Rows of `frame` to chart at most `max_points` points per column of `columns`.
+
+    Each column is decimated against the `x` column on its own (LTTB or
+    min/max buckets) and the union of the kept rows is returned in order,
+    so every series keeps its own peaks. Frames that are already small
+    enough are returned unchanged.
+    """
+    if len(frame) <= max_points:
+        return frame
+    x_values = frame[x].to_numpy()
+    keep = []
+    for column in columns:
+        y_values = frame[column].to_numpy()
+        if method == "lttb":
+            keep.append(lttb_indices(x_values, y_values, max_points))
+        elif method == "minmax":
+            keep.append(minmax_indices(y_values, max_points // 2))
+        else:
+            raise ValueError(f"Unknown decimation method '{method}', expected 'lttb' or 'minmax'")
+    return frame.iloc[np.unique(np.concatenate(keep))].reset_index(drop=True)
+
+
+def decimated_range(columns, x, start=None, end=None, max_points=MAX_CHART_POINTS, method="lttb"):
+    """
+    A bounded-size DataFrame of the rows with `start` <= x <= `end` from
+    column arrays (e.g. memory-mapped session columns).
+
+    Only the selected range is read and decimated, so narrowing the range
+    gives more detail, down to full resolution once it holds fewer than
+    `max_points` rows.
+    """
+    times = columns[x]
+    lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+    hi = len(times) if end is None else int(np.searchsorted(times, end, side="right"))
+    frame = pd.DataFrame({name: np.asarray(values[lo:hi]) for name, values in columns.items()})
+    return decimate_frame(frame, x, [name for name in columns if name != x], max_points, method)
@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from vocal.config import CHUNK_SECONDS, SAMPLE_RATE
+from vocal.features import analyze_speech, extract_features, extract_features_batch
+from vocal.multires import MultiResolutionAnalyzer
+from vocal.stream import SlidingWindowAnalyzer
+
+
+# --- Single Chunk ---
+def analyze_chunk(audio, sr=SAMPLE_RATE, copy=True):
+    """
+    Extract features from one audio chunk and return (features, alerts).
+
+    Pass copy=False to let the analyser sanitise a float32 `audio` in place.
+    """
+    features = extract_features(audio, sr, copy=copy)
+    return features, analyze_speech(features)
+
+
+# --- Batch of Chunks ---
+def analyze_chunks(chunks, sr=SAMPLE_RATE, max_workers=1):
+    """
+    Analyse independent chunks and return a list of (features, alerts).
+
+    With `max_workers` > 1 (or None for one per core) the chunks are spread
+    over a process pool; results keep the input order.
+    """
+    chunks = list(chunks)
+    if max_workers == 1 or len(chunks) <= 1:
+        return [analyze_chunk(chunk, sr) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(analyze_chunk, chunks, [sr] * len(chunks)))
+
+
+# --- Many Streams at Once ---
+def analyze_batch(chunks, sr=SAMPLE_RATE):
+    """
+    Analyse one equal-length chunk per stream, e.g. the latest chunk of every
+    speaker in a room, and return a list of (features, alerts) in row order.
+
+    `chunks` is a (streams, samples) array; see extract_features_batch.
+    """
+    return [(features, analyze_speech(features)) for features in extract_features_batch(chunks, sr)]
+
+
+# --- Stream of Chunks ---
+def analyze_stream(blocks, sr=SAMPLE_RATE, chunk_seconds=CHUNK_SECONDS, hop_seconds=None, slow_hop_seconds=None):
+    """
+    Analyse an iterable of audio blocks of any size as one continuous stream.
+
+    Yields (timestamp, features, alerts), where timestamp is the start of the
+    analysed window in seconds. By default the stream is cut into
+    non-overlapping `chunk_seconds` windows, like the live analyser. With
+    `hop_seconds` set, a SlidingWindowAnalyzer updates every hop over a
+    `chunk_seconds` window instead; adding `slow_hop_seconds` switches to a
+    MultiResolutionAnalyzer that refreshes the long-context features only
+    that often. A trailing partial window is dropped.
+    """
+    if hop_seconds is not None:
+        if slow_hop_seconds is not None:
+            analyzer = MultiResolutionAnalyzer(sr, window_seconds=chunk_seconds, hop_seconds=hop_seconds,
+                                               slow_hop_seconds=slow_hop_seconds)
+        else:
+            analyzer = SlidingWindowAnalyzer(sr, window_seconds=chunk_seconds, hop_seconds=hop_seconds)
+        window_samples = int(chunk_seconds * sr)
+        step = analyzer.hop_samples
+    else:
+        analyzer = None
+        window_samples = step = int(chunk_seconds * sr)
+
+    pending = np.zeros(0, dtype=np.float32)
+    consumed = 0 # Samples already handed to the analyser
+    for block in blocks:
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim > 1:
+            block = np.mean(block, axis=1)
+        pending = np.concatenate([pending, block])
+        while len(pending) >= step:
+            chunk, pending = pending[:step], pending[step:]
+            consumed += step
+            if analyzer is not None:
+                features = analyzer.push(chunk)
+                alerts = analyze_speech(features)
+            else:
+                features, alerts = analyze_chunk(chunk, sr, copy=False) # chunk is our own slice
+            yield max(consumed - window_samples, 0) / sr, features, alerts
@@ -0,0 +1,219 @@
+import threading
+import warnings
+
+import numpy as np
+import librosa
+
+from vocal.pitch import estimate_pitch
+from vocal.preprocess import prepare_audio, prepare_batch
+from vocal.record import FeatureRecord, empty_features
+from vocal.rules import ALERT_RULES
+from vocal.spectral import _finite_row_means, extract_spectral_features, extract_spectral_features_batch, frame_sizes
+from vocal.timing import finish_chunk, start_chunk, timed_stage
+from vocal.vad import MIN_SPEECH_FRACTION, MIN_TEMPO_SPEECH_FRACTION, frame_activity, speech_frames, speech_samples
+
+
+# Per-thread chunk buffer reused across calls; nothing returned references it
+_scratch = threading.local()
+
+
+def _scratch_buffer(n):
+    buffer = getattr(_scratch, "buffer", None)
+    if buffer is None or len(buffer) < n:
+        buffer = _scratch.buffer = np.empty(n, dtype=np.float32)
+    return buffer
+
+
+# --- Feature Extraction Function ---
+def extract_features(audio, sr, vad=True, copy=True, mfcc_matrix=False):
+    """
+    Extract the vocal features of one chunk as a compact FeatureRecord.
+
+    The chunk is sanitised once (NaN/inf -> 0, mono float32, clipped to
+    [-1, 1]) into a reusable buffer and every stage works on views of it.
+    With copy=False a float32 mono `audio` is sanitised in place instead, for
+    callers that own the array (e.g. a chunk unpickled in a worker). The full
+    MFCC matrix is only kept when `mfcc_matrix` is set.
+    """
+    return FeatureRecord.from_dict(_extract_feature_dict(audio, sr, vad, copy), mfcc_matrix=mfcc_matrix)
+
+
+def _extract_feature_dict(audio, sr, vad, copy):
+    features = {}
+    # Clean the audio buffer once to prevent "not finite everywhere" errors
+    audio = np.asarray(audio)
+    audio = prepare_audio(audio, out=_scratch_buffer(len(audio)) if copy else None)
+
+    # Handle very short or silent audio chunks at the beginning
+    if len(audio) < sr * 0.1 or np.all(np.abs(audio) < 1e-6): # If very short or near silent
+        return empty_features()
+
+    timing = start_chunk() # Per-stage timings are only collected when VOCAL_TIMING=1
+
+    # Voice-activity gate: cheap per-frame energy/ZCR decides whether the heavy
+    # stages run at all, and pitch only sees the speech frames
+    rms_values = zcr_values = None
+    speech_audio = audio
+    features["speech_ratio"] = 1.0 # Not measured when the gate is off
+    if vad:
+        try:
+            with timed_stage("vad"):
+                rms_values, zcr_values = frame_activity(audio, sr)
+                frame_mask = speech_frames(rms_values, zcr_values)
+                features["speech_ratio"] = float(np.mean(frame_mask))
+                speech_audio = audio[speech_samples(frame_mask, len(audio), sr)]
+        except Exception: # Fail open: analyse the whole chunk
+            rms_values = zcr_values = None
+
+        if features["speech_ratio"] < MIN_SPEECH_FRACTION:
+            features = empty_features()
+            features["rms_mean"] = float(np.mean(rms_values[np.isfinite(rms_values)]))
+            features["zcr_mean"] = float(np.mean(zcr_values[np.isfinite(zcr_values)]))
+            features["speech_ratio"] = float(np.mean(frame_mask))
+            stage_timings = finish_chunk(timing)
+            if stage_timings is not None:
+                features["stage_timings"] = stage_timings
+            return features
+
+    # Pitch tracking (engine chosen per deployment via VOCAL_PITCH_ENGINE, pyin by default;
+    # the live incremental analysers are YIN-only)
+    try:
+        with timed_stage("pitch"):
+            if len(speech_audio) >= sr * 0.1:
+                features["pitch_mean"], features["pitch_std"] = estimate_pitch(speech_audio, sr)
+            else:
+                features["pitch_mean"], features["pitch_std"] = 0.0, 0.0
+    except Exception: # Catch broader exceptions for robustness
+        features["pitch_mean"] = 0.0
+        features["pitch_std"] = 0.0
+    
+    try:
+        with timed_stage("zcr"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if zcr_values is None:
+                n_fft, hop_length = frame_sizes(sr)
+                zcr_values = librosa.feature.zero_crossing_rate(y=audio, frame_length=n_fft, hop_length=hop_length)
+            features["zcr_mean"] = float(np.mean(zcr_values[np.isfinite(zcr_values)]))
+    except Exception:
+        features["zcr_mean"] = 0.0
+        
+    # RMS, MFCC, tempo, spectral centroid/bandwidth and chroma share one STFT pass.
+    # Tempo needs at least 2 seconds and is skipped when the chunk is mostly pauses
+    with_tempo = len(audio) >= sr * 2 and features["speech_ratio"] >= MIN_TEMPO_SPEECH_FRACTION
+    features.update(extract_spectral_features(audio, sr, rms_values=rms_values, tempo=with_tempo))
+
+    stage_timings = finish_chunk(timing)
+    if stage_timings is not None:
+        features["stage_timings"] = stage_timings
+
+    return features
+
+# --- Batched Feature Extraction ---
+def extract_features_batch(chunks, sr, vad=True, mfcc_matrix=False):
+    """
+    extract_features for many streams at once, e.g. every speaker in a room.
+
+    `chunks` is a (streams, samples) array of equal-length mono chunks.
+    Sanitising, voice activity, RMS/ZCR and the STFT-based features run as
+    one vectorised call over all streams that are not silent; pitch is still
+    tracked per stream on its own speech samples. Returns one FeatureRecord
+    per row, matching extract_features on that row (to float rounding).
+    """
+    return [FeatureRecord.from_dict(features, mfcc_matrix=mfcc_matrix)
+            for features in _extract_batch_dicts(prepare_batch(chunks), sr, vad)]
+
+
+def _extract_batch_dicts(audio, sr, vad):
+    n_streams, n_samples = audio.shape
+    results = [empty_features() for _ in range(n_streams)]
+    if n_samples < sr * 0.1:
+        return results
+    active = ~np.all(np.abs(audio) < 1e-6, axis=1)
+    if not active.any():
+        return results
+
+    timing = start_chunk()
+
+    # Voice-activity gate per stream, computed for the whole batch at once
+    rms_values = zcr_values = frame_mask = None
+    speech_ratio = np.ones(n_streams) # Not measured when the gate is off
+    if vad:
+        try:
+            with timed_stage("vad"):
+                rms_values, zcr_values = frame_activity(audio, sr)
+                frame_mask = speech_frames(rms_values, zcr_values)
+                speech_ratio = np.mean(frame_mask, axis=1)
+        except Exception: # Fail open: analyse the whole chunks
+            rms_values = zcr_values = frame_mask = None
+
+        # Mostly pauses: loudness/ZCR only, like extract_features
+        paused = np.flatnonzero(active & (speech_ratio < MIN_SPEECH_FRACTION))
+        if len(paused):
+            rms_means = _finite_row_means(rms_values[paused])
+            zcr_means = _finite_row_means(zcr_values[paused])
+            for i, row in enumerate(paused):
+                results[row].update(rms_mean=rms_means[i], zcr_mean=zcr_means[i], speech_ratio=float(speech_ratio[row]))
+
+    rows = np.flatnonzero(active & (speech_ratio >= MIN_SPEECH_FRACTION))
+    batch = [{"speech_ratio": float(speech_ratio[row])} for row in rows]
+    if len(rows):
+        # Pitch tracks each stream's own speech samples, so it stays per stream
+        with timed_stage("pitch") as stage:
+            for features, row in zip(batch, rows):
+                try:
+                    speech_audio = audio[row]
+                    if frame_mask is not None:
+                        speech_audio = speech_audio[speech_samples(frame_mask[row], n_samples, sr)]
+                    if len(speech_audio) >= sr * 0.1:
+                        features["pitch_mean"], features["pitch_std"] = estimate_pitch(speech_audio, sr)
+                    else:
+                        features["pitch_mean"], features["pitch_std"] = 0.0, 0.0
+                except Exception:
+                    stage.fail()
+                    features["pitch_mean"] = 0.0
+                    features["pitch_std"] = 0.0
+
+        try:
+            with timed_stage("zcr"), warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                if zcr_values is None:
+                    n_fft, hop_length = frame_sizes(sr)
+                    batch_zcr = librosa.feature.zero_crossing_rate(y=audio[rows], frame_length=n_fft, hop_length=hop_length)
+                else:
+                    batch_zcr = zcr_values[rows]
+                for features, value in zip(batch, _finite_row_means(batch_zcr)):
+                    features["zcr_mean"] = value
+        except Exception:
+            for features in batch:
+                features["zcr_mean"] = 0.0
+
+        # One STFT pass over every analysed stream; tempo only where extract_features would run it
+        with_tempo = (n_samples >= sr * 2) & (speech_ratio[rows] >= MIN_TEMPO_SPEECH_FRACTION)
+        spectral = extract_spectral_features_batch(
+            audio[rows], sr, rms_values=None if rms_values is None else rms_values[rows], tempo=with_tempo
+        )
+        for features, row, spectral_features in zip(batch, rows, spectral):
+            features.update(spectral_features)
+            results[row] = features
+
+    stage_timings = finish_chunk(timing)
+    if stage_timings is not None:
+        for row in np.flatnonzero(active):
+            results[row]["stage_timings"] = stage_timings
+
+    return results
+
+# --- Speech Analysis (Alerts) Function ---
+def analyze_speech(features):
+    """
+    Alert messages for one chunk's features (dict or FeatureRecord).
+
+    The thresholds live in vocal.rules.ALERT_RULES, which alert_masks also
+    evaluates column-wise for many chunks at once. Missing metrics count as 0.
+    """
+    alerts = []
+    for _, metric, lower, upper, message in ALERT_RULES:
+        value = features.get(metric, 0.0)
+        if (lower is None or value > lower) and (upper is None or value < upper):
+            alerts.append(message)
+    return alerts
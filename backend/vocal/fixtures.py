@@ -0,0 +1,42 @@
+import numpy as np
+
+# Synthetic signals available to benchmarks and warm-up
+FIXTURES = ["voiced", "noise", "silence", "clipped", "nan"]
+
+
+def _voiced(n, sr, rng):
+    """Harmonic 'vowel' with vibrato, pitch jitter and a syllable-rate envelope."""
+    t = np.arange(n) / sr
+    f0 = 140 * (1 + 0.05 * np.sin(2 * np.pi * 5 * t)) + 4 * np.cumsum(rng.standard_normal(n)) / np.sqrt(sr)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    harmonics = sum((0.6 ** k) * np.sin(k * phase) for k in range(1, 8))
+    syllables = np.clip(np.sin(2 * np.pi * 2.2 * t), 0, None) ** 0.5 # ~4.4 syllables per second
+    return 0.08 * harmonics * syllables + 0.003 * rng.standard_normal(n)
+
+
+def synthetic_audio(kind, duration, sr, seed=0):
+    """
+    Deterministic speech-like test signal as float32.
+
+    kind: "voiced" (harmonic speech-like tone), "noise" (room noise),
+    "silence", "clipped" (overdriven voiced signal beyond [-1, 1]) or "nan"
+    (voiced signal with NaN/inf dropouts, as a broken device may deliver).
+    """
+    n = int(duration * sr)
+    rng = np.random.default_rng(seed)
+    if kind == "voiced":
+        audio = _voiced(n, sr, rng)
+    elif kind == "noise":
+        audio = 0.02 * rng.standard_normal(n)
+    elif kind == "silence":
+        audio = np.zeros(n)
+    elif kind == "clipped":
+        audio = 20 * _voiced(n, sr, rng)
+    elif kind == "nan":
+        audio = _voiced(n, sr, rng)
+        dropouts = rng.choice(n, size=max(n // 1000, 1), replace=False)
+        audio[dropouts] = np.nan
+        audio[dropouts[::7]] = np.inf
+    else:
+        raise ValueError(f"Unknown fixture '{kind}', expected one of {FIXTURES}")
+    return audio.astype(np.float32)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+
+# --- Feature Time Series ---
+class FeatureHistory:
+    """
+    Fixed-capacity, array-backed time series of per-chunk metrics.
+
+    Rows are appended in O(1) into a preallocated buffer; once `capacity`
+    rows are stored the oldest is overwritten. Every row is written twice
+    (at i and i + capacity) so the newest rows are always one contiguous
+    slice, and `view`/`since` return zero-copy NumPy views. A DataFrame is
+    only built by `to_frame`, when a chart actually needs one.
+
+    The first column is the time axis and must be non-decreasing.
+    """
+
+    def __init__(self, columns, capacity=1024):
+        self.columns = list(columns)
+        self.capacity = int(capacity)
+        self._data = np.zeros((2 * self.capacity, len(self.columns)), dtype=np.float64)
+        self._head = 0  # Next write position in [0, capacity)
+        self._count = 0 # Rows currently stored
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def empty(self):
+        return self._count == 0
+
+    def append(self, row):
+        """Append one row given as a dict keyed by column or a sequence in column order."""
+        if isinstance(row, dict):
+            row = [row[column] for column in self.columns]
+        self._data[self._head] = row
+        self._data[self._head + self.capacity] = row
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def view(self, last=None):
+        """The newest `last` rows (all stored rows by default) in time order, without copying."""
+        n = self._count if last is None else min(int(last), self._count)
+        end = self._head + self.capacity
+        return self._data[end - n:end]
+
+    def since(self, start_time):
+        """Rows whose time is >= `start_time`, without copying."""
+        rows = self.view()
+        return rows[np.searchsorted(rows[:, 0], start_time, side="left"):]
+
+    def column(self, name, start_time=None):
+        rows = self.view() if start_time is None else self.since(start_time)
+        return rows[:, self.columns.index(name)]
+
+    def to_frame(self, start_time=None):
+        rows = self.view() if start_time is None else self.since(start_time)
+        return pd.DataFrame(rows, columns=self.columns)
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
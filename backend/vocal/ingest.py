@@ -0,0 +1,123 @@
+import numpy as np
+
+from vocal.config import CHUNK_SECONDS, SAMPLE_RATE
+from vocal.resample import StreamingResampler
+
+# Little-endian PCM sample formats accepted from clients
+PCM_FORMATS = {
+    "f32": np.dtype("<f4"),
+    "s16": np.dtype("<i2"),
+}
+MAX_CHANNELS = 8
+MAX_BLOCK_SECONDS = 10 # Longest audio a single message may carry
+# Client-controlled rates bounded so one stream cannot monopolise a worker:
+# a tiny input rate turns a few bytes into seconds of audio, a tiny hop turns
+# each second into dozens of analysed windows and replies
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 96000
+MIN_HOP_SECONDS = 0.25
+
+
+class StreamLimitError(ValueError):
+    """A client-supplied stream parameter is outside the range the server accepts."""
+
+
+# --- Remote PCM Stream ---
+class PCMStreamSession:
+    """
+    Incremental analysis of one client's raw PCM stream.
+
+    Binary messages of interleaved little-endian samples (`fmt` "f32" or
+    "s16", at `sample_rate` with `channels` channels) are fed in as they
+    arrive. The audio is mixed down, resampled once to the analysis rate and
+    pushed hop by hop through a SlidingWindowAnalyzer, so each session keeps
+    its own window state. Message boundaries do not need to line up with
+    samples or hops.
+
+    `sample_rate` must lie in [MIN_SAMPLE_RATE, MAX_SAMPLE_RATE];
+    `hop_seconds` is clamped to [MIN_HOP_SECONDS, window_seconds].
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, fmt="f32", channels=1,
+                 window_seconds=CHUNK_SECONDS, hop_seconds=0.5):
+        if fmt not in PCM_FORMATS:
+            raise ValueError(f"Unsupported PCM format '{fmt}', expected one of {sorted(PCM_FORMATS)}")
+        if not 1 <= channels <= MAX_CHANNELS:
+            raise ValueError(f"channels must be between 1 and {MAX_CHANNELS}")
+        if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+            raise StreamLimitError(f"sample_rate must be between {MIN_SAMPLE_RATE} and {MAX_SAMPLE_RATE} Hz")
+        if not np.isfinite(hop_seconds):
+            raise StreamLimitError("hop must be a finite number of seconds")
+        hop_seconds = min(max(hop_seconds, MIN_HOP_SECONDS), window_seconds)
+        # Imported here so light importers (e.g. the FastAPI app) do not pay for librosa
+        from vocal.stream import SlidingWindowAnalyzer
+
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.dtype = PCM_FORMATS[fmt]
+        self.frame_bytes = self.dtype.itemsize * channels
+        self.max_block_bytes = int(MAX_BLOCK_SECONDS * sample_rate) * self.frame_bytes
+        self.window_samples = int(window_seconds * SAMPLE_RATE)
+        self._resampler = StreamingResampler(sample_rate, SAMPLE_RATE)
+        self._analyzer = SlidingWindowAnalyzer(SAMPLE_RATE, window_seconds=window_seconds, hop_seconds=hop_seconds)
+        self.reset()
+
+    @property
+    def hop_seconds(self):
+        return self._analyzer.hop_seconds
+
+    def reset(self):
+        """Forget all buffered audio and window state, e.g. when the speaker changes."""
+        self._remainder = b"" # Trailing bytes of an incomplete sample frame
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._consumed = 0 # Samples at the analysis rate already pushed
+        self._resampler.reset()
+        self._analyzer.reset()
+
+    def _decode(self, data):
+        data = self._remainder + bytes(data)
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=self.dtype)
+        if self.dtype.kind == "i":
+            samples = samples.astype(np.float32) / 32768.0
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        return samples
+
+    def feed(self, data):
+        """
+        Add one message of PCM bytes and analyse every hop it completes.
+
+        Returns a list of (timestamp, record, alerts), where timestamp is the
+        start of the analysed window in seconds of stream time; empty until a
+        whole hop has arrived.
+        """
+        from vocal.features import analyze_speech
+
+        if len(data) > self.max_block_bytes:
+            raise ValueError(f"PCM message longer than {MAX_BLOCK_SECONDS} s of audio")
+        block = self._resampler.process(self._decode(data))
+        pending = np.concatenate([self._pending, block])
+
+        results = []
+        step = self._analyzer.hop_samples
+        n_hops = len(pending) // step
+        for i in range(n_hops):
+            record = self._analyzer.push(pending[i * step:(i + 1) * step])
+            self._consumed += step
+            timestamp = max(self._consumed - self.window_samples, 0) / SAMPLE_RATE
+            results.append((timestamp, record, analyze_speech(record)))
+        self._pending = pending[n_hops * step:]
+        return results
+
+
+def record_payload(record):
+    """JSON-ready scalar features of a FeatureRecord (array payloads are left out)."""
+    payload = {}
+    for key in record.keys():
+        value = record[key]
+        if isinstance(value, np.ndarray):
+            continue
+        payload[key] = list(value) if isinstance(value, tuple) else value
+    return payload
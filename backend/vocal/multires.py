@@ -0,0 +1,168 @@
+import warnings
+
+import numpy as np
+
+from vocal.pitch import _pitch_stats
+from vocal.preprocess import prepare_audio
+from vocal.record import FeatureRecord, empty_features
+from vocal.spectral import frame_sizes
+from vocal.stream import (
+    _ACTIVITY_FRAME_FEATURES, _SPECTRAL_FRAME_FEATURES, _FrameWindow, _activity_frames, _finite_mean,
+    _spectral_frames, _spectral_summary, _speech_ratio, aligned_hop_samples
+)
+from vocal.timing import finish_chunk, start_chunk, timed_stage
+from vocal.vad import MIN_SPEECH_FRACTION
+
+# --- Feature Tiers ---
+# (tier, metrics it reports): "fast" is summarised over the short window on
+# every hop, "slow" over the long window every `slow_hop_seconds`
+FEATURE_TIERS = [
+    ("fast", ("rms_mean", "zcr_mean", "pitch_mean", "speech_ratio")),
+    ("slow", ("pitch_std", "tempo", "mfccs", "spectral_centroid", "spectral_bandwidth", "chroma_mean")),
+]
+_TIER_METRICS = dict(FEATURE_TIERS)
+
+
+class TierSchedule:
+    """
+    Decides which feature tiers are due on each hop.
+
+    `every` maps a tier to its cadence in hops; a tier is due on every hop
+    whose number (counting from 1) is a multiple of its cadence.
+    """
+
+    def __init__(self, every):
+        self.every = dict(every)
+        self.tick = 0
+
+    def reset(self):
+        self.tick = 0
+
+    def advance(self):
+        """Move to the next hop and return the tiers due on it, in FEATURE_TIERS order."""
+        self.tick += 1
+        return [tier for tier, _ in FEATURE_TIERS if self.tick % self.every[tier] == 0]
+
+
+# --- Multi-Resolution Analyzer ---
+class MultiResolutionAnalyzer:
+    """
+    Incremental analysis at two time scales.
+
+    Loudness, ZCR, mean pitch and speech ratio are cheap and should react
+    quickly, so on every hop they are computed for the new frames and
+    summarised over the last `fast_window_seconds`. Pitch variation, tempo,
+    MFCC and the spectral shape need long context and cost more, so their
+    per-frame spectra are caught up in one pass and summarised over the last
+    `window_seconds` only every `slow_hop_seconds`; in between, the last
+    slow values are carried over. Pitch is tracked with frame-wise YIN, as in
+    SlidingWindowAnalyzer. `push` returns the same FeatureRecord as
+    SlidingWindowAnalyzer, and `due` lists the tiers it refreshed.
+    """
+
+    def __init__(self, sr, window_seconds=3.0, hop_seconds=0.25,
+                 fast_window_seconds=1.0, slow_hop_seconds=1.0):
+        self.sr = sr
+        self.n_fft, self.hop_length = frame_sizes(sr)
+        self.hop_samples = aligned_hop_samples(sr, hop_seconds)
+        self.window_frames = self._frames_in(window_seconds)
+        self.fast_frames = min(self._frames_in(fast_window_seconds), self.window_frames)
+        self._schedule = TierSchedule({
+            "fast": 1,
+            "slow": max(int(round(slow_hop_seconds * sr / self.hop_samples)), 1),
+        })
+        self.reset()
+
+    def _frames_in(self, seconds):
+        return 1 + max(int(seconds * self.sr) - self.n_fft, 0) // self.hop_length
+
+    @property
+    def hop_seconds(self):
+        return self.hop_samples / self.sr
+
+    @property
+    def slow_hop_seconds(self):
+        return self._schedule.every["slow"] * self.hop_seconds
+
+    def reset(self):
+        self._fast = _FrameWindow(self.window_frames, _ACTIVITY_FRAME_FEATURES)
+        self._slow = _FrameWindow(self.window_frames, _SPECTRAL_FRAME_FEATURES)
+        # Audio from the first frame without spectra onwards (covers every not-yet-framed sample)
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._schedule.reset()
+        self._features = empty_features()
+        self.due = []
+
+    def push(self, samples, mfcc_matrix=False):
+        """Add new mono samples and return the FeatureRecord after this hop."""
+        samples = np.asarray(samples).reshape(-1)
+        audio = np.empty(len(self._audio) + len(samples), dtype=np.float32)
+        audio[:len(self._audio)] = self._audio
+        prepare_audio(samples, out=audio[len(self._audio):])
+        self._audio = audio
+        timing = start_chunk()
+
+        self._analyse_fast_frames()
+        self.due = self._schedule.advance()
+        if "slow" in self.due:
+            self._analyse_slow_frames()
+
+        if "fast" in self.due:
+            self._features.update(self._fast_summary())
+        if "slow" in self.due:
+            self._features.update(self._slow_summary())
+        features = dict(self._features)
+        stage_timings = finish_chunk(timing)
+        if stage_timings is not None:
+            features["stage_timings"] = stage_timings
+        return FeatureRecord.from_dict(features, mfcc_matrix=mfcc_matrix)
+
+    def _analyse_fast_frames(self):
+        n_fft, hop_length = self.n_fft, self.hop_length
+        offset = (self._fast.count - self._slow.count) * hop_length
+        available = len(self._audio) - offset
+        if available < n_fft:
+            return
+        n_new = 1 + (available - n_fft) // hop_length
+        segment = self._audio[offset:offset + (n_new - 1) * hop_length + n_fft]
+        self._fast.append(_activity_frames(segment, self.sr, n_fft, hop_length))
+
+    def _analyse_slow_frames(self):
+        """Spectra of every frame framed since the last slow update, in one STFT."""
+        n_fft, hop_length = self.n_fft, self.hop_length
+        n_new = self._fast.count - self._slow.count
+        if n_new == 0:
+            return
+        self._slow.append(_spectral_frames(self._audio[:(n_new - 1) * hop_length + n_fft], self.sr))
+        self._audio = self._audio[n_new * hop_length:]
+
+    def _fast_summary(self):
+        features = empty_features(_TIER_METRICS["fast"])
+        n = self.fast_frames
+        if len(self._fast) == 0 or np.all(self._fast.get("peak", n) < 1e-6):
+            return features
+        with timed_stage("summary"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            features["speech_ratio"] = _speech_ratio(self._fast, n)
+            features["rms_mean"] = _finite_mean(self._fast.get("rms", n))
+            features["zcr_mean"] = _finite_mean(self._fast.get("zcr", n))
+            if features["speech_ratio"] >= MIN_SPEECH_FRACTION:
+                features["pitch_mean"] = _pitch_stats(self._fast.get("f0", n)[:, 0].astype(np.float64))[0]
+        return features
+
+    def _slow_summary(self):
+        # Speech and pitch come from the activity frames covering the same (long) window
+        features = empty_features(_TIER_METRICS["slow"] + ("mfcc_plot_data",))
+        window = self._slow
+        if len(window) == 0 or np.all(self._fast.get("peak", len(window)) < 1e-6):
+            return features
+
+        with timed_stage("summary"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            speech_ratio = _speech_ratio(self._fast, len(window))
+            if speech_ratio < MIN_SPEECH_FRACTION:
+                return features # Mostly pauses over the long window too
+            features["pitch_std"] = _pitch_stats(self._fast.get("f0", len(window))[:, 0].astype(np.float64))[1]
+
+        features.update(_spectral_summary(window, self.sr, self.n_fft, self.hop_length, speech_ratio))
+        return features
@@ -0,0 +1,74 @@
+import functools
+import threading
+
+import numpy as np
+import librosa
+
+N_MELS = 128
+N_CHROMA = 12
+
+
+# --- Feature Plan ---
+class FeaturePlan:
+    """
+    Per-configuration state of the spectral features, built once per (sr, n_fft, hop_length).
+
+    Owns the analysis window, the mel filterbank and the chroma filterbanks
+    (one per estimated tuning, cached as tunings are seen) plus per-thread
+    STFT scratch buffers, so a steady-state chunk only runs FFTs and matrix
+    products. Every method gives the same values as the librosa call it
+    replaces, which rebuilds these matrices on each call.
+    """
+
+    def __init__(self, sr, n_fft, hop_length):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.window = librosa.filters.get_window("hann", n_fft, fftbins=True)
+        # librosa's S= paths infer the FFT size back from the number of bins
+        self._bins_n_fft = 2 * (n_fft // 2)
+        self.mel_basis = librosa.filters.mel(sr=sr, n_fft=self._bins_n_fft, n_mels=N_MELS)
+        self._scratch = threading.local()
+
+    def _stft_buffer(self, shape, dtype):
+        """This thread's reused complex STFT buffer, with room for at least `shape`."""
+        buffers = getattr(self._scratch, "stft", None)
+        if buffers is None:
+            buffers = self._scratch.stft = {}
+        key = (tuple(shape[:-1]), dtype)
+        buffer = buffers.get(key)
+        if buffer is None or buffer.shape[-1] < shape[-1]:
+            # Fortran order, like librosa's own STFT matrix
+            buffer = buffers[key] = np.empty(shape, dtype=dtype, order="F")
+        return buffer
+
+    def spectrogram(self, audio, center=True):
+        """Magnitude and power spectrograms of `audio` (any leading batch dimensions)."""
+        n_samples = audio.shape[-1] + (2 * (self.n_fft // 2) if center else 0)
+        n_frames = 1 + (n_samples - self.n_fft) // self.hop_length
+        out = self._stft_buffer((*audio.shape[:-1], 1 + self.n_fft // 2, n_frames), librosa.util.dtype_r2c(audio.dtype))
+        stft = librosa.stft(audio, n_fft=self.n_fft, hop_length=self.hop_length,
+                            window=self.window, center=center, out=out)
+        magnitude = np.abs(stft)
+        return magnitude, magnitude ** 2.0
+
+    def melspectrogram(self, power):
+        """librosa.feature.melspectrogram(S=power, sr=sr)"""
+        return self.mel_basis @ power
+
+    @functools.lru_cache(maxsize=None)
+    def chroma_basis(self, tuning):
+        return librosa.filters.chroma(sr=self.sr, n_fft=self._bins_n_fft, tuning=tuning, n_chroma=N_CHROMA)
+
+    def chroma(self, power):
+        """librosa.feature.chroma_stft(S=power, sr=sr) for one stream's power spectrogram."""
+        # The tuning estimate is quantised, so only a handful of filterbanks are ever built
+        tuning = librosa.estimate_tuning(S=power, sr=self.sr, bins_per_octave=N_CHROMA)
+        raw_chroma = self.chroma_basis(float(tuning)) @ power
+        return librosa.util.normalize(raw_chroma, norm=np.inf, axis=-2)
+
+
+@functools.lru_cache(maxsize=None)
+def feature_plan(sr, n_fft, hop_length):
+    """The shared FeaturePlan for one framing configuration."""
+    return FeaturePlan(sr, n_fft, hop_length)
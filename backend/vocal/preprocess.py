@@ -0,0 +1,46 @@
+import numpy as np
+
+
+# --- Input Sanitising ---
+def prepare_audio(audio, out=None):
+    """
+    Sanitise a chunk to mono float32 in [-1, 1] with NaN/inf replaced by 0.
+
+    Every step works in place on a single float32 buffer: `out` if given
+    (at least len(audio) samples; a view of its head is returned), otherwise
+    `audio` itself when it already is a writable 1-D float32 array, otherwise
+    one new array. Gives the same values as nan_to_num -> astype -> clip.
+    """
+    audio = np.asarray(audio)
+    if audio.ndim > 1:
+        # Zero non-finite samples per channel before the channels are mixed down
+        audio = np.mean(np.nan_to_num(audio, nan=0.0, posinf=0.0, neginf=0.0), axis=1)
+
+    if out is not None:
+        buffer = out[:len(audio)]
+        buffer[...] = audio
+    elif audio.dtype == np.float32 and audio.ndim == 1 and audio.flags.writeable:
+        buffer = audio
+    else:
+        buffer = audio.astype(np.float32)
+    return _sanitise(buffer)
+
+
+def prepare_batch(chunks):
+    """
+    prepare_audio for a (streams, samples) batch of mono chunks.
+
+    Always returns a new float32 array; rows are not mixed down.
+    """
+    chunks = np.asarray(chunks)
+    if chunks.ndim != 2:
+        raise ValueError(f"Expected a (streams, samples) array, got shape {chunks.shape}")
+    return _sanitise(chunks.astype(np.float32))
+
+
+def _sanitise(buffer):
+    # Clean audio (the usual case) only costs the finiteness check
+    if not np.isfinite(buffer).all():
+        np.nan_to_num(buffer, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    np.clip(buffer, -1.0, 1.0, out=buffer)
+    return buffer
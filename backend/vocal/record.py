@@ -0,0 +1,96 @@
+from dataclasses import dataclass, fields
+from typing import Optional
+
+import numpy as np
+
+from vocal.config import N_MFCC
+
+# Scalar metrics every record carries, in schema order
+SCALAR_FIELDS = (
+    "pitch_mean", "pitch_std", "rms_mean", "zcr_mean", "tempo",
+    "spectral_centroid", "spectral_bandwidth", "chroma_mean", "speech_ratio",
+)
+
+
+# --- Feature Record ---
+@dataclass(slots=True)
+class FeatureRecord:
+    """
+    Fixed-schema features of one analysed chunk.
+
+    Holds the scalar metrics and the MFCC means only (well under 1 KiB per
+    chunk), so a whole session of records stays small. Heavy or debug
+    payloads are None unless asked for: `mfcc_plot_data` (the full
+    13 x frames MFCC matrix, `extract_features(..., mfcc_matrix=True)`) and
+    `stage_timings` (VOCAL_TIMING=1).
+
+    Supports read-only mapping access (`record["pitch_mean"]`,
+    `record.get("tempo", 0.0)`), so code written against the old feature
+    dicts keeps working.
+    """
+    pitch_mean: float = 0.0
+    pitch_std: float = 0.0
+    rms_mean: float = 0.0
+    zcr_mean: float = 0.0
+    tempo: float = 0.0
+    mfccs: tuple = (0.0,) * N_MFCC
+    spectral_centroid: float = 0.0
+    spectral_bandwidth: float = 0.0
+    chroma_mean: float = 0.0
+    speech_ratio: float = 0.0
+    mfcc_plot_data: Optional[np.ndarray] = None
+    stage_timings: Optional[dict] = None
+
+    @classmethod
+    def from_dict(cls, features, mfcc_matrix=False):
+        """Build a record from a feature dict, keeping the MFCC matrix only if `mfcc_matrix`."""
+        record = cls(**{key: features[key] for key in SCALAR_FIELDS if key in features})
+        if "mfccs" in features:
+            record.mfccs = tuple(features["mfccs"])
+        if mfcc_matrix:
+            record.mfcc_plot_data = features.get("mfcc_plot_data")
+        record.stage_timings = features.get("stage_timings")
+        return record
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        """Field names, leaving out payloads that were not collected."""
+        return [f.name for f in fields(self) if getattr(self, f.name) is not None]
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.keys()}
+
+
+def empty_features(keys=None):
+    """
+    Feature dict of a chunk where nothing was measured, from FeatureRecord's defaults.
+
+    `keys` limits it to some of the features. The MFCC means are a list and
+    `mfcc_plot_data` a 13 x 1 zero matrix (the placeholder MFCC plot);
+    `stage_timings` is left out.
+    """
+    features = {}
+    for field in fields(FeatureRecord):
+        if field.name == "stage_timings" or (keys is not None and field.name not in keys):
+            continue
+        if field.name == "mfcc_plot_data":
+            features[field.name] = np.zeros((N_MFCC, 1))
+        elif isinstance(field.default, tuple):
+            features[field.name] = list(field.default)
+        else:
+            features[field.name] = field.default
+    return features
@@ -0,0 +1,44 @@
+import numpy as np
+import soxr
+
+
+# --- Streaming Resampler ---
+class StreamingResampler:
+    """
+    Converts a stream of mono blocks from `in_rate` to `out_rate` once, at the source.
+
+    The filter state is carried across blocks, so block boundaries leave no
+    edge artefacts and every downstream stage sees one continuous signal at
+    the analysis rate. The resampler holds back a few milliseconds of audio
+    (its filter delay); pass `last=True` or call `flush` to drain it. When
+    both rates match, blocks are passed through untouched.
+    """
+
+    def __init__(self, in_rate, out_rate, quality="HQ"):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self._quality = quality
+        self._stream = None
+        self.reset()
+
+    @property
+    def passthrough(self):
+        return self._stream is None
+
+    def reset(self):
+        """Drop any buffered audio, e.g. before a new recording."""
+        if self.in_rate == self.out_rate:
+            self._stream = None
+        else:
+            self._stream = soxr.ResampleStream(self.in_rate, self.out_rate, 1, dtype="float32", quality=self._quality)
+
+    def process(self, block, last=False):
+        """Resample the next float32 block; returns however many output samples are ready."""
+        block = np.ascontiguousarray(block, dtype=np.float32).reshape(-1)
+        if self._stream is None:
+            return block
+        return self._stream.resample_chunk(block, last=last)
+
+    def flush(self):
+        """Return the audio still held in the filter at the end of the stream."""
+        return self.process(np.zeros(0, dtype=np.float32), last=True)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+
+# --- Alert Rules ---
+# (rule id, metric, lower, upper, message): the alert fires when lower < value < upper,
+# with None for an open end. A lower bound of 0 means "only if the metric was
+# detected"; NaN never fires. analyze_speech
+# and alert_masks both evaluate this table, so they always agree. Spectral and
+# ZCR bounds assume analysis at REFERENCE_SAMPLE_RATE (see vocal.config).
+ALERT_RULES = [
+    # 🎵 Pitch: thresholds for typical adult speech
+    ("pitch_low", "pitch_mean", 0, 80, # e.g. whispering or an extremely deep voice
+     "📢 Your pitch is quite low. Try speaking with more energy or varying your tone."),
+    ("pitch_high", "pitch_mean", 280, None,
+     "📢 Your pitch is unusually high. Consider a more relaxed, natural tone."),
+    ("monotone", "pitch_std", 0, 13, # Low variation in pitch
+     "🎙️ Your voice lacks variation. Try adding some pitch dynamics for expressiveness."),
+
+    # 🔊 Loudness / Energy
+    ("too_soft", "rms_mean", None, 0.015,
+     "🔈 You're speaking too softly. Increase your volume for better audibility."),
+    ("too_loud", "rms_mean", 0.18, None,
+     "🔊 Your volume is quite high. Lower it slightly to avoid sounding aggressive."),
+
+    # 🕒 Tempo
+    ("too_slow", "tempo", 0, 90,
+     "🐢 You may be speaking too slowly. Increase your pace to keep listeners engaged."),
+    ("too_fast", "tempo", 160, None,
+     "⚡ You're speaking too fast. Try slowing down for better clarity and comprehension."),
+
+    # 🫧 Articulation: high ZCR can indicate noise, sibilance, or very rapid, crisp articulation
+    ("sibilance", "zcr_mean", 0.15, None,
+     "💨 Your speech has high sibilance or sharpness. Focus on precise articulation without hissing."),
+
+    # 🧠 Spectral centroid: low values can indicate a muffled or dull sound
+    ("muffled", "spectral_centroid", 0, 1500,
+     "🔈 Your voice might sound a bit muffled. Try to speak more clearly or with more frontal resonance."),
+
+    # 📶 Spectral bandwidth: low values can indicate a thin or less resonant voice
+    ("thin", "spectral_bandwidth", 0, 1800,
+     "📉 Your voice may sound dull or lack fullness — try increasing enunciation and opening your mouth more."),
+
+    # 🎶 Chroma: low values can indicate less harmonic richness or expressiveness
+    ("flat_chroma", "chroma_mean", 0, 0.3,
+     "🎵 Add more pitch variation for a dynamic voice. Let your voice rise and fall to convey emotion."),
+]
+
+RULE_IDS = [rule[0] for rule in ALERT_RULES]
+
+
+def alert_masks(table):
+    """
+    Evaluate every rule over whole columns at once.
+
+    `table` is a DataFrame or a dict of equal-length metric arrays, one row
+    per chunk; missing metrics count as 0 like in analyze_speech. Returns a
+    DataFrame of booleans, one column per rule id in ALERT_RULES order.
+    """
+    n = len(table) if isinstance(table, pd.DataFrame) else max((len(v) for v in table.values()), default=0)
+    columns = {}
+    masks = {}
+    for rule_id, metric, lower, upper, _ in ALERT_RULES:
+        if metric not in columns:
+            columns[metric] = np.asarray(table[metric], dtype=np.float64) if metric in table else np.zeros(n)
+        values = columns[metric]
+        mask = np.ones(n, dtype=bool)
+        if lower is not None:
+            mask &= values > lower
+        if upper is not None:
+            mask &= values < upper
+        masks[rule_id] = mask
+    index = table.index if isinstance(table, pd.DataFrame) else None
+    return pd.DataFrame(masks, index=index)
+
+
+def alerts_from_masks(masks):
+    """Per-chunk alert message lists, identical to calling analyze_speech on each row."""
+    messages = np.array([rule[4] for rule in ALERT_RULES], dtype=object)
+    values = masks[RULE_IDS].to_numpy()
+    return [list(messages[row]) for row in values]
+
+
+def alert_counts(table, by=None):
+    """
+    Number of chunks that triggered each rule.
+
+    Returns a Series over rule ids, or with `by` (e.g. "file") a DataFrame
+    with one row per session.
+    """
+    masks = alert_masks(table)
+    if by is None:
+        return masks.sum().astype(int)
+    return masks.groupby(np.asarray(table[by]), sort=False).sum().astype(int)
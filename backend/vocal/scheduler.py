@@ -0,0 +1,281 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from dotenv import load_dotenv
+
+from vocal.config import CHUNK_SECONDS, SAMPLE_RATE
+from vocal.warmup import spawn_context, warm_up, worker_ready
+load_dotenv()
+
+# Most analysis processes (started only as streams arrive), and live streams each may host at once
+STREAM_WORKERS = int(os.getenv("VOCAL_STREAM_WORKERS", "0")) or os.cpu_count() or 1
+STREAMS_PER_WORKER = int(os.getenv("VOCAL_STREAMS_PER_WORKER", "4"))
+
+# Sessions of the streams assigned to this worker process, by stream id
+_sessions = {}
+
+
+def _init_stream_host():
+    warm_up(SAMPLE_RATE, window_seconds=CHUNK_SECONDS)
+
+
+def _open_session(stream_id, session_kwargs):
+    from vocal.ingest import PCMStreamSession
+    _sessions[stream_id] = PCMStreamSession(**session_kwargs)
+    return _sessions[stream_id].hop_seconds
+
+
+def _feed_session(stream_id, data):
+    start = time.perf_counter()
+    results = _sessions[stream_id].feed(data)
+    return results, time.perf_counter() - start
+
+
+def _reset_session(stream_id):
+    _sessions[stream_id].reset()
+
+
+def _close_session(stream_id):
+    _sessions.pop(stream_id, None)
+
+
+class PoolFullError(RuntimeError):
+    """Every analysis worker already hosts its maximum number of streams."""
+
+
+class WorkerLostError(RuntimeError):
+    """The process hosting a stream died, taking the stream's session with it."""
+
+
+class _StreamWorker:
+    """One analysis process and the bookkeeping the scheduler keeps for it."""
+
+    def __init__(self, index, context):
+        self.index = index
+        self.context = context
+        self.streams = set()
+        self.hops = 0     # Analysed hops across all streams
+        self.busy_s = 0.0 # Time spent analysing
+        self.restarts = 0 # Times a dead process was replaced
+        self.spawn()
+
+    def spawn(self):
+        # A single process per executor, so a stream's jobs run in order on the process holding its state.
+        # The executor only starts its process on the first submitted job
+        self.executor = ProcessPoolExecutor(max_workers=1, mp_context=self.context, initializer=_init_stream_host)
+        self.queued = 0      # Jobs submitted and not yet finished
+        self.broken = False  # Process died; replaced before the next stream is placed
+        self.started = False # Warm-up submitted, i.e. the process exists or is starting
+        self.pid = None
+
+    def set_pid(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.pid = future.result()
+
+
+# --- Stream Scheduler ---
+class StreamScheduler:
+    """
+    Spreads live PCM streams over a pool of analysis processes.
+
+    Each stream opened with `open` is pinned to the worker hosting the fewest
+    streams, since its PCMStreamSession (resampler and window state) lives
+    in that process. A worker hosts at most `max_streams_per_worker`
+    streams; once all are full, `open` raises PoolFullError. `feed`,
+    `reset` and `close` return concurrent futures, so the caller (e.g. an
+    asyncio endpoint via asyncio.wrap_future) never blocks on analysis.
+    Worker processes start (and warm up) when the first stream is placed
+    on them, so an idle server runs none; `start` warms them all up front.
+    A worker whose process dies is replaced (again without starting a
+    process) on the next `open` or `load`; the streams it hosted fail with
+    WorkerLostError. `load` reports per-worker streams, queue depth and
+    utilisation.
+    """
+
+    def __init__(self, workers=None, max_streams_per_worker=None):
+        self.max_streams_per_worker = max(int(max_streams_per_worker or STREAMS_PER_WORKER), 1)
+        context = spawn_context()
+        self._workers = [_StreamWorker(i, context) for i in range(workers or STREAM_WORKERS)]
+        self._assignments = {} # stream id -> worker
+        self._lock = threading.Lock() # Job callbacks run in executor threads
+        self._started = time.perf_counter()
+
+    @property
+    def capacity(self):
+        return len(self._workers) * self.max_streams_per_worker
+
+    def start(self):
+        """Spawn and warm up every idle worker without waiting for them; returns their futures."""
+        with self._lock:
+            idle = [w for w in self._workers if not w.started]
+            for worker in idle:
+                worker.started = True
+        return [self._warm(worker) for worker in idle]
+
+    def _warm(self, worker):
+        future = self._submit(worker, worker_ready)
+        future.add_done_callback(worker.set_pid)
+        return future
+
+    def _respawn_broken(self):
+        """Replace the process of every worker found dead; the streams it hosted are dropped."""
+        # Also catches processes that died while idle, which no job has noticed yet
+        # (active_children reaps them)
+        alive = {process.pid for process in multiprocessing.active_children()}
+        with self._lock:
+            for worker in self._workers:
+                if worker.pid is not None and worker.pid not in alive:
+                    worker.broken = True
+            broken = [w for w in self._workers if w.broken]
+            dead_executors = [w.executor for w in broken]
+            for worker in broken:
+                for stream_id in worker.streams:
+                    self._assignments.pop(stream_id, None)
+                worker.streams.clear()
+                worker.restarts += 1
+                worker.spawn()
+        # Outside the lock: cancelling their jobs runs the job callbacks, which take it
+        for executor in dead_executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def open(self, **session_kwargs):
+        """
+        Assign a new stream to the least-loaded worker.
+
+        `session_kwargs` are passed to PCMStreamSession. Returns
+        (stream_id, future); the future resolves to the stream's hop in
+        seconds, or raises ValueError for invalid stream parameters.
+        """
+        # A worker that died while idle is only found out when a job is submitted to it,
+        # so place the stream again (on its respawned process) if that happens
+        for _ in range(len(self._workers) + 1):
+            self._respawn_broken()
+            with self._lock:
+                open_workers = [w for w in self._workers if len(w.streams) < self.max_streams_per_worker]
+                if not open_workers:
+                    raise PoolFullError(f"All {len(self._workers)} analysis workers are at their limit "
+                                        f"of {self.max_streams_per_worker} streams")
+                worker = min(open_workers, key=lambda w: (len(w.streams), w.queued))
+                stream_id = uuid.uuid4().hex
+                worker.streams.add(stream_id)
+                self._assignments[stream_id] = worker
+                cold, worker.started = not worker.started, True
+            try:
+                if cold:
+                    self._warm(worker) # Starts the process; the session opens once it is warm
+                return stream_id, self._submit(worker, _open_session, stream_id, session_kwargs)
+            except Exception as e:
+                # Release the slot taken above
+                with self._lock:
+                    worker.streams.discard(stream_id)
+                    self._assignments.pop(stream_id, None)
+                if not isinstance(e, WorkerLostError):
+                    raise
+                lost = e
+        raise lost
+
+    def _worker_of(self, stream_id):
+        with self._lock:
+            worker = self._assignments.get(stream_id)
+        if worker is None:
+            raise WorkerLostError(f"Stream {stream_id[:8]} is not open, or its analysis worker died")
+        return worker
+
+    def feed(self, stream_id, data):
+        """Analyse one PCM message; the future resolves to PCMStreamSession.feed's results."""
+        return self._submit(self._worker_of(stream_id), _feed_session, stream_id, data, timed=True)
+
+    def reset(self, stream_id):
+        """Clear a stream's buffered audio and window state."""
+        return self._submit(self._worker_of(stream_id), _reset_session, stream_id)
+
+    def _submit(self, worker, fn, *args, timed=False):
+        """
+        Run `fn` on `worker`, tracking its queue depth (and, if `timed`, its busy time).
+
+        Raises (or resolves to) WorkerLostError if the worker's process has
+        died; the worker is then marked for respawning.
+        """
+        with self._lock:
+            executor = worker.executor
+            worker.queued += 1
+
+        def _lost(error):
+            with self._lock:
+                if worker.executor is executor:
+                    worker.broken = True
+            lost = WorkerLostError(f"Analysis worker {worker.index} died")
+            lost.__cause__ = error
+            return lost
+
+        try:
+            job = executor.submit(fn, *args)
+        except Exception as e:
+            with self._lock:
+                if worker.executor is executor:
+                    worker.queued -= 1
+            if isinstance(e, BrokenProcessPool):
+                raise _lost(e)
+            raise
+        future = Future()
+
+        def _finished(job):
+            with self._lock:
+                # Jobs of a replaced process do not count against its successor
+                if worker.executor is executor:
+                    worker.queued -= 1
+            if job.cancelled():
+                future.cancel()
+            elif isinstance(job.exception(), BrokenProcessPool):
+                future.set_exception(_lost(job.exception()))
+            elif job.exception() is not None:
+                future.set_exception(job.exception())
+            elif timed:
+                results, busy_s = job.result()
+                with self._lock:
+                    worker.hops += len(results)
+                    worker.busy_s += busy_s
+                future.set_result(results)
+            else:
+                future.set_result(job.result())
+
+        job.add_done_callback(_finished)
+        return future
+
+    def close(self, stream_id):
+        """Release a stream's slot and drop its session; unknown ids are ignored."""
+        with self._lock:
+            worker = self._assignments.pop(stream_id, None)
+            if worker is None:
+                return
+            worker.streams.discard(stream_id)
+        try:
+            worker.executor.submit(_close_session, stream_id)
+        except RuntimeError:
+            pass # Worker already shut down
+
+    def load(self):
+        """Per-worker load: hosted streams, queued jobs, analysed hops and the fraction of time spent busy."""
+        self._respawn_broken() # So streams of a dead process are not reported as hosted
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        with self._lock:
+            return [{
+                "worker": worker.index,
+                "pid": worker.pid,
+                "streams": len(worker.streams),
+                "max_streams": self.max_streams_per_worker,
+                "queued": worker.queued,
+                "hops": worker.hops,
+                "restarts": worker.restarts,
+                "utilisation": round(worker.busy_s / elapsed, 4),
+            } for worker in self._workers]
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.executor.shutdown(wait=False, cancel_futures=True)
+        self._assignments.clear()
@@ -0,0 +1,235 @@
+"""
+Full-session vocal history on disk.
+
+Every analysed chunk of a session is appended to a directory holding one
+standard .npy file per column (time, the scalar metrics, the MFCC means):
+
+    sessions/<session id>/time.npy, pitch_mean.npy, ..., mfcc_12.npy
+
+Rows are collected in memory and written in blocks by a background thread,
+so appending never waits for the disk; a block is written once it is full or
+`FLUSH_SECONDS` old, even if no more rows arrive. Files are only ever appended to;
+each keeps a fixed-size header whose shape is updated in place after every
+block, so a session can be read (and memory-mapped) while it is still being
+recorded:
+
+    columns = load_session(path)              # {column: read-only memmap}
+    table = session_frame(path)               # pandas DataFrame
+"""
+import os
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from vocal.config import MIN_SPEECH_FRACTION, N_MFCC
+from vocal.record import SCALAR_FIELDS
+from vocal.rules import alert_counts
+load_dotenv()
+
+# Directory under which each session gets its own folder (an empty VOCAL_SESSION_DIR means the default)
+SESSION_DIR = os.getenv("VOCAL_SESSION_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sessions")
+# Session ids name that folder and may come from the browser, so no path characters
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def valid_session_id(session_id):
+    """Whether `session_id` can safely name a session folder."""
+    return isinstance(session_id, str) and SESSION_ID_PATTERN.fullmatch(session_id) is not None
+
+COLUMNS = ("time",) + SCALAR_FIELDS + tuple(f"mfcc_{i}" for i in range(N_MFCC))
+COLUMN_DTYPES = {name: np.dtype("<f8") if name == "time" else np.dtype("<f4") for name in COLUMNS}
+
+BLOCK_ROWS = 256     # Rows buffered before a block is handed to the writer thread
+FLUSH_SECONDS = 10.0 # ...or this long after the block's first row, whichever comes first
+
+# .npy header padded to a fixed size, so the row count can be rewritten in place
+_NPY_HEADER_BYTES = 128
+
+
+def _npy_header(dtype, n_rows):
+    header = repr({"descr": dtype.str, "fortran_order": False, "shape": (n_rows,)})
+    prefix_bytes = 10 # Magic string, format version 1.0 and the header length
+    header = header.ljust(_NPY_HEADER_BYTES - prefix_bytes - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + (len(header)).to_bytes(2, "little") + header.encode("latin1")
+
+
+def _stored_rows(path, name):
+    file_path = os.path.join(path, f"{name}.npy")
+    if not os.path.exists(file_path):
+        return 0
+    return max(os.path.getsize(file_path) - _NPY_HEADER_BYTES, 0) // COLUMN_DTYPES[name].itemsize
+
+
+# --- Session Writer ---
+class SessionWriter:
+    """
+    Appends FeatureRecords of one session to its columnar store.
+
+    `append` only copies the row into the current in-memory block; full
+    blocks are queued to a writer thread that appends them to the column
+    files, which also writes out a block once it is `flush_seconds` old, so
+    the rows recorded before a pause reach the disk. Call `close` at the end
+    of the session to write the last partial block.
+    """
+
+    def __init__(self, session_id=None, root=SESSION_DIR, block_rows=BLOCK_ROWS, flush_seconds=FLUSH_SECONDS):
+        if session_id is not None and not valid_session_id(session_id):
+            raise ValueError(f"Invalid session id {session_id!r}, expected {SESSION_ID_PATTERN.pattern}")
+        self.session_id = session_id or time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(root, self.session_id)
+        os.makedirs(self.path, exist_ok=True)
+        self.block_rows = int(block_rows)
+        self.flush_seconds = flush_seconds
+        # Resume an existing session after its last complete row
+        self.rows = min((_stored_rows(self.path, name) for name in COLUMNS), default=0) # Rows appended so far
+        for name in COLUMNS:
+            file_path = os.path.join(self.path, f"{name}.npy")
+            with open(file_path, "r+b" if os.path.exists(file_path) else "w+b") as f:
+                # Drop rows a stopped writer left in only some of the columns
+                f.truncate(_NPY_HEADER_BYTES + self.rows * COLUMN_DTYPES[name].itemsize)
+                f.seek(0)
+                f.write(_npy_header(COLUMN_DTYPES[name], self.rows))
+        self.written = self.rows # Rows on disk, i.e. visible to readers
+        self._lock = threading.Lock() # Guards the in-memory block, shared with the writer thread
+        self._new_block()
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._write_blocks, name=f"session-writer-{self.session_id}", daemon=True)
+        self._thread.start()
+
+    def _new_block(self):
+        self._block = {name: np.empty(self.block_rows, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        self._block_rows = 0
+        self._block_started = None
+
+    def append(self, timestamp, features):
+        """Buffer one chunk's features (FeatureRecord or feature dict) taken at `timestamp` seconds."""
+        if self._error is not None:
+            raise RuntimeError(f"Session writer for {self.path} failed") from self._error
+        with self._lock:
+            i = self._block_rows
+            block = self._block
+            block["time"][i] = timestamp
+            for name in SCALAR_FIELDS:
+                block[name][i] = features.get(name, 0.0)
+            for k, value in enumerate(features.get("mfccs", (0.0,) * N_MFCC)[:N_MFCC]):
+                block[f"mfcc_{k}"][i] = value
+            self._block_rows += 1
+            self.rows += 1
+            if self._block_started is None:
+                self._block_started = time.monotonic()
+            if self._block_rows >= self.block_rows or self._block_stale():
+                self._queue_block()
+
+    def _block_stale(self):
+        return self._block_started is not None and time.monotonic() - self._block_started >= self.flush_seconds
+
+    def _queue_block(self):
+        if self._block_rows:
+            self._queue.put({name: values[:self._block_rows] for name, values in self._block.items()})
+            self._new_block()
+
+    def flush(self):
+        """Hand the buffered rows to the writer thread without waiting for the write."""
+        with self._lock:
+            self._queue_block()
+
+    def _write_blocks(self):
+        while True:
+            try:
+                block = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                # No full block for a while (e.g. the speaker paused): write out the partial one
+                with self._lock:
+                    if self._block_stale():
+                        self._queue_block()
+                continue
+            try:
+                if block is None:
+                    return
+                n_rows = self.written + len(block["time"])
+                for name, values in block.items():
+                    with open(os.path.join(self.path, f"{name}.npy"), "r+b") as f:
+                        f.seek(0, os.SEEK_END)
+                        f.write(values.tobytes())
+                        # Readers see the new rows only once they are fully on disk
+                        f.seek(0)
+                        f.write(_npy_header(COLUMN_DTYPES[name], n_rows))
+                self.written = n_rows
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def close(self, timeout=None):
+        """Write any buffered rows and stop the writer thread."""
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._error is not None:
+            raise RuntimeError(f"Session writer for {self.path} failed") from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- Reading Sessions ---
+def load_session(path, mmap=True):
+    """Columns of a recorded session as {name: array}, memory-mapped read-only by default."""
+    # Columns are written one after another, so trim to the rows every column already has
+    columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None) for name in COLUMNS}
+    n_rows = min(len(values) for values in columns.values())
+    return {name: values[:n_rows] for name, values in columns.items()}
+
+
+def session_frame(path):
+    """A recorded session as a DataFrame, one row per analysed chunk."""
+    return pd.DataFrame({name: np.asarray(values) for name, values in load_session(path).items()})
+
+
+def latest_session(root=SESSION_DIR):
+    """Path of the most recently written session under `root`, or None."""
+    if not os.path.isdir(root):
+        return None
+    sessions = [os.path.join(root, name) for name in os.listdir(root)
+                if os.path.exists(os.path.join(root, name, "time.npy"))]
+    return max(sessions, key=lambda path: os.path.getmtime(os.path.join(path, "time.npy")), default=None)
+
+
+def session_summary(path):
+    """
+    Whole-session vocal summary for the final report.
+
+    Pitch, loudness and spectral means are taken over the chunks with speech
+    (tempo over those where it was measured); `alerts` maps each rule id to
+    the fraction of chunks that triggered it.
+    """
+    table = session_frame(path)
+    if table.empty:
+        return None
+    voiced = table[table["speech_ratio"] >= MIN_SPEECH_FRACTION]
+    tempo = voiced["tempo"][voiced["tempo"] > 0]
+    counts = alert_counts(table)
+
+    def mean(values):
+        return round(float(values.mean()), 3) if len(values) else 0.0
+
+    return {
+        "chunks": len(table),
+        "duration_s": round(float(table["time"].iloc[-1] - table["time"].iloc[0]), 2),
+        "speech_ratio": mean(table["speech_ratio"]),
+        "pitch_mean": mean(voiced["pitch_mean"]),
+        "pitch_std": mean(voiced["pitch_std"]),
+        "rms_mean": mean(voiced["rms_mean"]),
+        "tempo": mean(tempo),
+        "spectral_centroid": mean(voiced["spectral_centroid"]),
+        "alerts": {rule: round(int(count) / len(table), 3) for rule, count in counts.items() if count},
+    }
@@ -0,0 +1,248 @@
+import functools
+import warnings
+
+import numpy as np
+import librosa
+
+from vocal.config import HOP_LENGTH, N_FFT, N_MFCC, scale_frames
+from vocal.plan import feature_plan
+from vocal.record import empty_features
+from vocal.timing import timed_stage
+
+# Use the updated path if available, fall back to the old one (resolved once at import)
+try:
+    from librosa.feature.rhythm import tempo as _tempo
+except ImportError:
+    _tempo = librosa.beat.tempo
+
+# Metrics the spectral stage reports
+SPECTRAL_FEATURES = ("rms_mean", "tempo", "mfccs", "spectral_centroid", "spectral_bandwidth",
+                     "chroma_mean", "mfcc_plot_data")
+
+
+@functools.lru_cache(maxsize=None)
+def frame_sizes(sr):
+    """(n_fft, hop_length) for `sr`: N_FFT and HOP_LENGTH scaled to keep their durations."""
+    return scale_frames(N_FFT, HOP_LENGTH, sr)
+
+
+def spectral_plan(sr):
+    """The FeaturePlan (window, filterbanks, scratch buffers) for analysis at `sr`."""
+    return feature_plan(sr, *frame_sizes(sr))
+
+
+def compute_spectrogram(audio, sr):
+    """Return the magnitude and power spectrograms of `audio` from a single STFT."""
+    return spectral_plan(sr).spectrogram(audio)
+
+
+def estimate_tempo(log_mel, sr):
+    """
+    Speaking tempo (BPM) from a log-mel spectrogram framed with frame_sizes(sr).
+
+    Same result as librosa's tempo(y=...) on the signal, without recomputing
+    the STFT and mel spectrogram behind its onset envelope.
+    """
+    n_fft, hop_length = frame_sizes(sr)
+    onset_env = librosa.onset.onset_strength(S=log_mel, sr=sr, n_fft=n_fft, hop_length=hop_length)
+    tempo_val = _tempo(onset_envelope=onset_env, sr=sr, hop_length=hop_length)[0]
+    return float(tempo_val) if np.isfinite(tempo_val) else 0.0
+
+
+# --- Spectral Feature Extraction ---
+def extract_spectral_features(audio, sr, rms_values=None, tempo=True):
+    """
+    Compute loudness, MFCC, tempo, centroid, bandwidth and chroma for one chunk.
+
+    The chunk is framed and FFT'd once; every spectral feature is derived from
+    that spectrogram through librosa's `S=` code paths or the equivalent
+    FeaturePlan matrices, so the values are identical to calling each
+    librosa feature on the raw signal. Tempo reuses
+    the MFCC stage's log-mel spectrogram and is left at 0.0 when `tempo` is
+    False. RMS stays in the time domain because the windowed spectral RMS is
+    not equivalent; pass `rms_values` if the frame RMS has already been computed.
+    """
+    features = empty_features(SPECTRAL_FEATURES)
+
+    try:
+        with timed_stage("rms"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if rms_values is None:
+                n_fft, hop_length = frame_sizes(sr)
+                rms_values = librosa.feature.rms(y=audio, frame_length=n_fft, hop_length=hop_length)
+            features["rms_mean"] = float(np.mean(rms_values[np.isfinite(rms_values)]))
+    except Exception:
+        features["rms_mean"] = 0.0
+
+    try:
+        with timed_stage("stft"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            magnitude, power = compute_spectrogram(audio, sr)
+    except Exception:
+        return features
+
+    log_mel = None
+    try:
+        with timed_stage("mfcc"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            mel = spectral_plan(sr).melspectrogram(power)
+            log_mel = librosa.power_to_db(mel)
+            mfccs = librosa.feature.mfcc(S=log_mel, n_mfcc=N_MFCC)
+            mfcc_means = np.mean(mfccs, axis=1)
+            mfcc_means = mfcc_means[np.isfinite(mfcc_means)]
+            if len(mfcc_means) >= N_MFCC:
+                features["mfccs"] = [float(val) for val in mfcc_means[:N_MFCC]]
+            else:
+                features["mfccs"] = [0.0]*N_MFCC
+            features["mfcc_plot_data"] = mfccs # Store raw MFCCs for plotting
+    except Exception:
+        features["mfccs"] = [0.0]*N_MFCC
+        features["mfcc_plot_data"] = np.zeros((N_MFCC, 1))
+
+    if tempo and log_mel is not None:
+        try:
+            with timed_stage("tempo"), warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                features["tempo"] = estimate_tempo(log_mel, sr)
+        except Exception:
+            features["tempo"] = 0.0
+
+    sc_values = None
+    try:
+        with timed_stage("centroid"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            sc_values = librosa.feature.spectral_centroid(S=magnitude, sr=sr)
+            features["spectral_centroid"] = float(np.mean(sc_values[np.isfinite(sc_values)]))
+    except Exception:
+        features["spectral_centroid"] = 0.0
+
+    try:
+        with timed_stage("bandwidth"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            # Reuse the centroid instead of letting librosa recompute it
+            sb_values = librosa.feature.spectral_bandwidth(S=magnitude, sr=sr, centroid=sc_values)
+            features["spectral_bandwidth"] = float(np.mean(sb_values[np.isfinite(sb_values)]))
+    except Exception:
+        features["spectral_bandwidth"] = 0.0
+
+    try:
+        with timed_stage("chroma"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            chroma_values = spectral_plan(sr).chroma(power)
+            features["chroma_mean"] = float(np.mean(chroma_values[np.isfinite(chroma_values)]))
+    except Exception:
+        features["chroma_mean"] = 0.0
+
+    return features
+
+
+# --- Batched Spectral Feature Extraction ---
+def _finite_row_means(values):
+    """Per-row mean of the finite values of a (rows, frames) array, as floats."""
+    values = values.reshape(len(values), -1)
+    means = values.mean(axis=1)
+    for row in np.flatnonzero(~np.isfinite(values).all(axis=1)):
+        means[row] = np.mean(values[row][np.isfinite(values[row])])
+    return [float(mean) for mean in means]
+
+
+def _power_to_db_rows(power, top_db=80.0):
+    """librosa.power_to_db applied to each row of a batch, with `top_db` relative to that row's peak."""
+    log_spec = librosa.power_to_db(power, top_db=None)
+    return np.maximum(log_spec, log_spec.max(axis=(-2, -1), keepdims=True) - top_db)
+
+
+def extract_spectral_features_batch(audio, sr, rms_values=None, tempo=None):
+    """
+    extract_spectral_features for a (streams, samples) batch of equal-length chunks.
+
+    RMS, the STFT, the mel filterbank and the DCT run once over the whole
+    batch, so their per-call overhead is paid once rather than per stream;
+    results match the per-chunk function row by row (to float rounding).
+    Tempo and chroma estimate per-stream parameters (onset tempo, tuning)
+    and run row by row, as do centroid and bandwidth. `rms_values` is an optional
+    (streams, frames) array; `tempo` an optional boolean per row. Returns one
+    feature dict per row.
+    """
+    n = len(audio)
+    results = [empty_features(SPECTRAL_FEATURES) for _ in range(n)]
+    tempo = np.ones(n, dtype=bool) if tempo is None else np.asarray(tempo, dtype=bool)
+
+    try:
+        with timed_stage("rms"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if rms_values is None:
+                n_fft, hop_length = frame_sizes(sr)
+                rms_values = librosa.feature.rms(y=audio, frame_length=n_fft, hop_length=hop_length)
+            for features, value in zip(results, _finite_row_means(rms_values)):
+                features["rms_mean"] = value
+    except Exception:
+        pass
+
+    try:
+        with timed_stage("stft"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            magnitude, power = compute_spectrogram(audio, sr)
+    except Exception:
+        return results
+
+    log_mel = None
+    try:
+        with timed_stage("mfcc"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            mel = spectral_plan(sr).melspectrogram(power)
+            log_mel = _power_to_db_rows(mel)
+            mfccs = librosa.feature.mfcc(S=log_mel, n_mfcc=N_MFCC)
+            mfcc_means = np.mean(mfccs, axis=-1)
+            for features, row_mfccs, row_means in zip(results, mfccs, mfcc_means):
+                if np.all(np.isfinite(row_means)):
+                    features["mfccs"] = [float(val) for val in row_means]
+                features["mfcc_plot_data"] = row_mfccs
+    except Exception:
+        pass
+
+    if log_mel is not None:
+        with timed_stage("tempo") as stage, warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for row in np.flatnonzero(tempo):
+                try:
+                    results[row]["tempo"] = estimate_tempo(log_mel[row], sr)
+                except Exception:
+                    stage.fail()
+                    results[row]["tempo"] = 0.0
+
+    # Centroid and bandwidth run per stream: on the stacked spectrogram their
+    # temporaries outgrow the cache and the batched call is about twice as slow
+    sc_values = [None] * n
+    with timed_stage("centroid") as stage, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for row, row_magnitude in enumerate(magnitude):
+            try:
+                sc_values[row] = librosa.feature.spectral_centroid(S=row_magnitude, sr=sr)
+                results[row]["spectral_centroid"] = float(np.mean(sc_values[row][np.isfinite(sc_values[row])]))
+            except Exception:
+                stage.fail()
+                results[row]["spectral_centroid"] = 0.0
+
+    with timed_stage("bandwidth") as stage, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for row, row_magnitude in enumerate(magnitude):
+            try:
+                sb_values = librosa.feature.spectral_bandwidth(S=row_magnitude, sr=sr, centroid=sc_values[row])
+                results[row]["spectral_bandwidth"] = float(np.mean(sb_values[np.isfinite(sb_values)]))
+            except Exception:
+                stage.fail()
+                results[row]["spectral_bandwidth"] = 0.0
+
+    with timed_stage("chroma") as stage, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for features, row_power in zip(results, power):
+            try:
+                # The tuning estimate is per stream, so the chroma filterbank is too
+                chroma_values = spectral_plan(sr).chroma(row_power)
+                features["chroma_mean"] = float(np.mean(chroma_values[np.isfinite(chroma_values)]))
+            except Exception:
+                stage.fail()
+                features["chroma_mean"] = 0.0
+
+    return results
@@ -0,0 +1,222 @@
+import warnings
+
+import numpy as np
+import librosa
+
+from vocal.config import aligned_hop_samples
+from vocal.pitch import _pitch_stats, yin_frames_f0
+from vocal.plan import N_CHROMA, N_MELS
+from vocal.preprocess import prepare_audio
+from vocal.record import FeatureRecord, empty_features
+from vocal.spectral import N_MFCC, estimate_tempo, frame_sizes, spectral_plan
+from vocal.timing import finish_chunk, start_chunk, timed_stage
+from vocal.vad import MIN_SPEECH_FRACTION, MIN_TEMPO_SPEECH_FRACTION, speech_frames
+
+# Per-frame features kept for the sliding window, with their width
+_ACTIVITY_FRAME_FEATURES = {"peak": 1, "rms": 1, "zcr": 1, "f0": 1}
+_SPECTRAL_FRAME_FEATURES = {"centroid": 1, "bandwidth": 1, "chroma": N_CHROMA, "mel": N_MELS}
+_FRAME_FEATURES = {**_ACTIVITY_FRAME_FEATURES, **_SPECTRAL_FRAME_FEATURES}
+
+
+def _finite_mean(values):
+    return float(np.mean(values[np.isfinite(values)]))
+
+
+class _FrameWindow:
+    """Circular per-frame feature storage holding the newest `capacity` frames."""
+
+    def __init__(self, capacity, features=_FRAME_FEATURES):
+        self.capacity = capacity
+        self.count = 0 # Total frames ever appended
+        self._data = {name: np.zeros((capacity, dim), dtype=np.float32) for name, dim in features.items()}
+
+    def append(self, block):
+        n = len(next(iter(block.values())))
+        for name, values in block.items():
+            values = np.asarray(values, dtype=np.float32).reshape(n, -1)[-self.capacity:]
+            rows = (self.count + n - len(values) + np.arange(len(values))) % self.capacity
+            self._data[name][rows] = values
+        self.count += n
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def get(self, name, last=None):
+        """The newest `last` (default all held) frames of `name` in chronological order, shape (n_frames, dim)."""
+        n = len(self) if last is None else min(last, len(self))
+        rows = (self.count - n + np.arange(n)) % self.capacity
+        return self._data[name][rows]
+
+
+# --- Frame Analysis and Window Summaries ---
+# Shared by SlidingWindowAnalyzer and vocal.multires.MultiResolutionAnalyzer
+def _activity_frames(segment, sr, n_fft, hop_length):
+    """Per-frame peak, RMS, ZCR and YIN pitch of `segment` (framed without centring)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with timed_stage("activity"):
+            frames = librosa.util.frame(segment, frame_length=n_fft, hop_length=hop_length)
+            peak = np.max(np.abs(frames), axis=0)
+            rms = librosa.feature.rms(y=segment, frame_length=n_fft, hop_length=hop_length, center=False)[0]
+            zcr = librosa.feature.zero_crossing_rate(segment, frame_length=n_fft, hop_length=hop_length, center=False)[0]
+        with timed_stage("pitch"):
+            # Pitch is only tracked on frames the voice-activity gate accepts
+            speech = speech_frames(rms, zcr)
+            f0 = np.full(len(rms), np.nan)
+            f0[speech] = yin_frames_f0(frames.T[speech], sr)
+    return {"peak": peak, "rms": rms, "zcr": zcr, "f0": f0}
+
+
+def _spectral_frames(segment, sr):
+    """Per-frame spectral centroid, bandwidth, chroma and mel energies of `segment`, from one STFT."""
+    plan = spectral_plan(sr)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with timed_stage("stft"):
+            magnitude, power = plan.spectrogram(segment, center=False)
+        with timed_stage("centroid"):
+            centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sr)
+        with timed_stage("bandwidth"):
+            bandwidth = librosa.feature.spectral_bandwidth(S=magnitude, sr=sr, centroid=centroid)
+        with timed_stage("chroma"):
+            chroma = plan.chroma(power)
+        with timed_stage("mel"):
+            mel = plan.melspectrogram(power)
+    return {"centroid": centroid[0], "bandwidth": bandwidth[0], "chroma": chroma.T, "mel": mel.T}
+
+
+def _speech_ratio(window, last=None):
+    """Fraction of the newest `last` (default all) frames of `window` that hold speech."""
+    return float(np.mean(speech_frames(window.get("rms", last)[:, 0], window.get("zcr", last)[:, 0])))
+
+
+# Metrics _spectral_summary reports
+_SPECTRAL_SUMMARY = ("tempo", "mfccs", "spectral_centroid", "spectral_bandwidth", "chroma_mean", "mfcc_plot_data")
+
+
+def _spectral_summary(window, sr, n_fft, hop_length, speech_ratio):
+    """
+    Spectral shape, MFCC means and tempo over the spectral frames held in `window`.
+
+    Metrics that cannot be computed keep their empty_features defaults.
+    """
+    features = empty_features(_SPECTRAL_SUMMARY)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with timed_stage("summary") as stage:
+            for key, name in (("spectral_centroid", "centroid"), ("spectral_bandwidth", "bandwidth"),
+                              ("chroma_mean", "chroma")):
+                try:
+                    features[key] = _finite_mean(window.get(name))
+                except Exception:
+                    stage.fail()
+                    features[key] = 0.0
+
+        # MFCC and tempo both come from the window's log-mel spectrogram
+        with timed_stage("mfcc") as stage:
+            log_mel = librosa.power_to_db(window.get("mel").T)
+            try:
+                mfccs = librosa.feature.mfcc(S=log_mel, n_mfcc=N_MFCC)
+                mfcc_means = np.mean(mfccs, axis=1)
+                if np.all(np.isfinite(mfcc_means)):
+                    features["mfccs"] = [float(val) for val in mfcc_means]
+                features["mfcc_plot_data"] = mfccs
+            except Exception:
+                stage.fail()
+
+        # At least 2 seconds, and not mostly pauses, for tempo estimation
+        if (len(window) - 1) * hop_length + n_fft >= sr * 2 and speech_ratio >= MIN_TEMPO_SPEECH_FRACTION:
+            try:
+                with timed_stage("tempo"):
+                    features["tempo"] = estimate_tempo(log_mel, sr)
+            except Exception:
+                features["tempo"] = 0.0
+    return features
+
+
+# --- Sliding-Window Analyzer ---
+class SlidingWindowAnalyzer:
+    """
+    Incremental vocal analysis over a sliding window.
+
+    Audio is pushed in hops (e.g. 0.5 s). Only the STFT frames completed by the
+    new samples are analysed; their per-frame pitch, loudness, ZCR, spectral,
+    chroma and mel values are cached, and each update summarises the last
+    `window_seconds` of cached frames into the same feature dict that
+    `extract_features` returns. Pitch always uses the frame-wise YIN tracker,
+    whatever VOCAL_PITCH_ENGINE says, since pyin's Viterbi pass has to see
+    the whole window.
+    """
+
+    def __init__(self, sr, window_seconds=3.0, hop_seconds=0.5):
+        self.sr = sr
+        self.n_fft, self.hop_length = frame_sizes(sr)
+        self.window_frames = 1 + max(int(window_seconds * sr) - self.n_fft, 0) // self.hop_length
+        self.hop_samples = aligned_hop_samples(sr, hop_seconds)
+        self._frames = _FrameWindow(self.window_frames)
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    @property
+    def hop_seconds(self):
+        return self.hop_samples / self.sr
+
+    def reset(self):
+        self._frames = _FrameWindow(self.window_frames)
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def push(self, samples, mfcc_matrix=False):
+        """Add new mono samples and return the FeatureRecord of the current window."""
+        samples = np.asarray(samples).reshape(-1)
+        # Sanitise the new samples straight into the grown pending buffer
+        pending = np.empty(len(self._pending) + len(samples), dtype=np.float32)
+        pending[:len(self._pending)] = self._pending
+        prepare_audio(samples, out=pending[len(self._pending):])
+        self._pending = pending
+        timing = start_chunk()
+
+        n_fft, hop_length = self.n_fft, self.hop_length
+        if len(self._pending) >= n_fft:
+            n_new = 1 + (len(self._pending) - n_fft) // hop_length
+            segment = self._pending[:(n_new - 1) * hop_length + n_fft]
+            self._frames.append(self._analyse_frames(segment))
+            self._pending = self._pending[n_new * hop_length:]
+
+        features = self._summary()
+        stage_timings = finish_chunk(timing)
+        if stage_timings is not None:
+            features["stage_timings"] = stage_timings
+        return FeatureRecord.from_dict(features, mfcc_matrix=mfcc_matrix)
+
+    def _analyse_frames(self, segment):
+        return {**_activity_frames(segment, self.sr, self.n_fft, self.hop_length),
+                **_spectral_frames(segment, self.sr)}
+
+    def features(self, mfcc_matrix=False):
+        """Summarise the cached frames of the current window as a FeatureRecord."""
+        return FeatureRecord.from_dict(self._summary(), mfcc_matrix=mfcc_matrix)
+
+    def _summary(self):
+        features = empty_features()
+        window = self._frames
+        if len(window) == 0 or np.all(window.get("peak") < 1e-6):
+            return features
+
+        with timed_stage("summary") as stage, warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            features["speech_ratio"] = _speech_ratio(window)
+            if features["speech_ratio"] < MIN_SPEECH_FRACTION:
+                # Mostly pauses: report loudness/ZCR only, like extract_features
+                features["rms_mean"] = _finite_mean(window.get("rms"))
+                features["zcr_mean"] = _finite_mean(window.get("zcr"))
+                return features
+
+            features["pitch_mean"], features["pitch_std"] = _pitch_stats(window.get("f0")[:, 0].astype(np.float64))
+            for key, name in (("rms_mean", "rms"), ("zcr_mean", "zcr")):
+                try:
+                    features[key] = _finite_mean(window.get(name))
+                except Exception:
+                    stage.fail()
+                    features[key] = 0.0
+
+        features.update(_spectral_summary(window, self.sr, self.n_fft, self.hop_length, features["speech_ratio"]))
+        return features
@@ -0,0 +1,129 @@
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+load_dotenv()
+
+# Opt-in: set VOCAL_TIMING=1 (inherited by worker processes) or call enable_timing()
+_enabled = os.getenv("VOCAL_TIMING", "0") == "1"
+
+# Stage records of the chunk currently being analysed in this thread/process
+_current_chunk = ContextVar("vocal_current_chunk", default=None)
+
+
+def enable_timing(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+
+def timing_enabled():
+    return _enabled
+
+
+class _Stage:
+    """Handle yielded by `timed_stage`."""
+    __slots__ = ("failures",)
+
+    def __init__(self):
+        self.failures = 0
+
+    def fail(self):
+        """Count a failure the stage recovered from itself (e.g. one row of a batch)."""
+        self.failures += 1
+
+
+@contextmanager
+def timed_stage(name):
+    """
+    Record wall/CPU time of a feature stage, and how often it failed.
+
+    Yields a handle whose `fail()` counts failures handled inside the stage;
+    an exception escaping the stage counts as one more and is re-raised so
+    the stage's own fallback still runs. A stage entered several times in
+    one chunk accumulates. Does nothing unless timing is enabled and a chunk
+    was started with `start_chunk`.
+    """
+    stage = _Stage()
+    record = _current_chunk.get()
+    if not _enabled or record is None:
+        yield stage
+        return
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield stage
+    except Exception:
+        stage.fail()
+        raise
+    finally:
+        timing = record.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "failed": False, "failures": 0})
+        timing["wall_s"] += time.perf_counter() - wall
+        timing["cpu_s"] += time.process_time() - cpu
+        timing["failures"] += stage.failures
+        timing["failed"] = timing["failures"] > 0
+
+
+def start_chunk():
+    """Begin collecting stage timings for one chunk; returns a token for `finish_chunk`."""
+    if not _enabled:
+        return None
+    return _current_chunk.set({})
+
+
+def finish_chunk(token):
+    """Stop collecting and return {stage: {"wall_s", "cpu_s", "failed", "failures"}}, also added to `stats`."""
+    if token is None:
+        return None
+    record = _current_chunk.get()
+    _current_chunk.reset(token)
+    stats.add(record)
+    return record
+
+
+# --- Rolling Aggregation ---
+class StageStats:
+    """Rolling per-stage percentiles over the last `window` chunks, plus lifetime failure counts."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self.chunks = 0
+        self._wall = defaultdict(lambda: deque(maxlen=self.window))
+        self._cpu = defaultdict(lambda: deque(maxlen=self.window))
+        self._calls = defaultdict(int)
+        self._failures = defaultdict(int)
+
+    def add(self, chunk_timings):
+        if not chunk_timings:
+            return
+        self.chunks += 1
+        for stage, timing in chunk_timings.items():
+            self._wall[stage].append(timing["wall_s"])
+            self._cpu[stage].append(timing["cpu_s"])
+            self._calls[stage] += 1
+            self._failures[stage] += timing.get("failures", int(timing["failed"]))
+
+    def summary(self):
+        """{stage: {calls, failures, wall/cpu p50/p95/p99 in ms}}."""
+        summary = {}
+        for stage in self._wall:
+            wall = np.asarray(self._wall[stage]) * 1000
+            cpu = np.asarray(self._cpu[stage]) * 1000
+            summary[stage] = {"calls": self._calls[stage], "failures": self._failures[stage]}
+            for q in (50, 95, 99):
+                summary[stage][f"wall_p{q}_ms"] = float(np.percentile(wall, q))
+                summary[stage][f"cpu_p{q}_ms"] = float(np.percentile(cpu, q))
+        return summary
+
+    def to_frame(self):
+        return pd.DataFrame.from_dict(self.summary(), orient="index").sort_values("wall_p95_ms", ascending=False)
+
+    def reset(self):
+        self.__init__(self.window)
+
+
+# Process-wide aggregate of every chunk analysed in this process
+stats = StageStats()
@@ -0,0 +1,36 @@
+import warnings
+
+import numpy as np
+import librosa
+
+# Thresholds live in vocal.config so light modules can use them without librosa
+from vocal.config import MAX_SPEECH_ZCR, MIN_SPEECH_FRACTION, MIN_TEMPO_SPEECH_FRACTION, SPEECH_RMS
+from vocal.spectral import frame_sizes
+
+
+def frame_activity(audio, sr):
+    """
+    Per-frame RMS and zero-crossing rate, framed exactly like
+    librosa.feature.rms / zero_crossing_rate so callers can reuse them.
+    A (streams, samples) batch gives (streams, frames) arrays.
+    """
+    n_fft, hop_length = frame_sizes(sr)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        rms = librosa.feature.rms(y=audio, frame_length=n_fft, hop_length=hop_length)[..., 0, :]
+        zcr = librosa.feature.zero_crossing_rate(y=audio, frame_length=n_fft, hop_length=hop_length)[..., 0, :]
+    return rms, zcr
+
+
+def speech_frames(rms, zcr):
+    """Boolean mask of frames that are loud enough and not noise-like."""
+    return np.isfinite(rms) & (rms >= SPEECH_RMS) & (zcr <= MAX_SPEECH_ZCR)
+
+
+def speech_samples(frame_mask, n_samples, sr):
+    """Expand a centred-frame mask to a per-sample mask (each frame owns one hop around its centre)."""
+    if len(frame_mask) == 0:
+        return np.zeros(n_samples, dtype=bool)
+    hop_length = frame_sizes(sr)[1]
+    frame_index = np.minimum((np.arange(n_samples) + hop_length // 2) // hop_length, len(frame_mask) - 1)
+    return frame_mask[frame_index]
@@ -0,0 +1,163 @@
+"""
+Analyser warm-up.
+
+The first chunk a fresh process analyses pays for importing librosa and for
+numba compiling every JIT-ed path it touches (several seconds with a cold
+cache), so the first feedback arrives far later than in steady state. Call
+`warm_up()` once at startup to move that cost before readiness is signalled.
+
+librosa caches compiled functions on disk; set VOCAL_NUMBA_CACHE_DIR to keep
+that cache in a writable directory shared by all analyser processes. The
+analysis modules are only imported inside `warm_up`, so the cache directory
+set by `configure_jit_cache` is picked up as long as this module is imported
+first.
+
+    python -m vocal.warmup --ready-file .analyzer_ready
+    python -m vocal.warmup --measure
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+from vocal.config import CHUNK_SECONDS, SAMPLE_RATE
+from vocal.fixtures import synthetic_audio
+load_dotenv()
+
+# Optional on-disk numba cache shared by analyser processes (inherited by spawned workers)
+NUMBA_CACHE_DIR = os.getenv("VOCAL_NUMBA_CACHE_DIR")
+
+
+def configure_jit_cache(cache_dir=None):
+    """
+    Point numba's on-disk cache at `cache_dir` (default VOCAL_NUMBA_CACHE_DIR).
+
+    Must run before librosa/numba are first imported in this process; worker
+    processes spawned afterwards inherit the setting. Returns the directory
+    in use, or None for numba's default location.
+    """
+    cache_dir = cache_dir or NUMBA_CACHE_DIR
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ.setdefault("NUMBA_CACHE_DIR", os.path.abspath(cache_dir))
+    return os.environ.get("NUMBA_CACHE_DIR")
+
+
+def spawn_context():
+    """
+    Multiprocessing context for analyser worker processes.
+
+    Spawned workers start free of the parent's threads (audio callbacks, an
+    event loop, Streamlit state) and inherit the on-disk JIT cache location.
+    """
+    configure_jit_cache()
+    return multiprocessing.get_context("spawn")
+
+
+def worker_ready():
+    """Pool job returning the worker's pid; it completes once the worker's initializer has run."""
+    return os.getpid()
+
+
+def warm_up(sr=SAMPLE_RATE, window_seconds=CHUNK_SECONDS, hop_seconds=0.5):
+    """
+    Import the analysis modules and run every feature path once on synthetic audio.
+
+    Covers full-chunk extraction (speech, silence-gated and non-speech
+    chunks), each pitch engine, alerting and the incremental analyser.
+    Stage timing is suspended so warm-up chunks do not show up in the
+    statistics. Returns {"import_s", "jit_s"}.
+    """
+    start = time.perf_counter()
+    from vocal.features import analyze_speech, extract_features
+    from vocal.pitch import PITCH_ENGINES, estimate_pitch
+    from vocal.stream import SlidingWindowAnalyzer
+    from vocal.timing import enable_timing, timing_enabled
+    imported = time.perf_counter()
+
+    timing = timing_enabled()
+    enable_timing(False)
+    try:
+        voiced = synthetic_audio("voiced", window_seconds, sr)
+        for kind in ("voiced", "noise", "silence"):
+            analyze_speech(extract_features(synthetic_audio(kind, window_seconds, sr), sr))
+        for engine in PITCH_ENGINES:
+            estimate_pitch(voiced, sr, engine=engine)
+
+        analyzer = SlidingWindowAnalyzer(sr, window_seconds=window_seconds, hop_seconds=hop_seconds)
+        stream = synthetic_audio("voiced", window_seconds + 2 * analyzer.hop_seconds, sr, seed=1)
+        for begin in range(0, len(stream) - analyzer.hop_samples + 1, analyzer.hop_samples):
+            analyzer.push(stream[begin:begin + analyzer.hop_samples])
+    finally:
+        enable_timing(timing)
+
+    return {"import_s": imported - start, "jit_s": time.perf_counter() - imported}
+
+
+# --- Cold vs warm first-chunk latency ---
+def _first_chunk_latency(sr, warm):
+    """Runs in a fresh process: time to the first analysed chunk, with or without warm-up."""
+    start = time.perf_counter()
+    report = warm_up(sr) if warm else {}
+    from vocal.engine import analyze_chunk
+    ready = time.perf_counter()
+
+    # A different signal than the warm-up uses, so nothing is trivially cached
+    chunk = synthetic_audio("voiced", CHUNK_SECONDS, sr, seed=7)
+    analyze_chunk(chunk, sr)
+    first = time.perf_counter()
+    analyze_chunk(chunk, sr)
+    steady = time.perf_counter()
+
+    report.update({
+        "startup_s": ready - start,
+        "first_chunk_s": first - ready,
+        "steady_chunk_s": steady - first,
+    })
+    return report
+
+
+def measure_first_chunk(sr=SAMPLE_RATE):
+    """First-chunk latency of a fresh analyser process, cold and after warm-up."""
+    context = spawn_context()
+    results = {}
+    for label, warm in (("cold", False), ("warm", True)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[label] = executor.submit(_first_chunk_latency, sr, warm).result()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm up the vocal analyser before serving audio.")
+    parser.add_argument("--sample-rate", type=int, default=SAMPLE_RATE)
+    parser.add_argument("--cache-dir", help="numba on-disk cache directory (default VOCAL_NUMBA_CACHE_DIR)")
+    parser.add_argument("--ready-file", help="write the warm-up report here once warm")
+    parser.add_argument("--measure", action="store_true", help="report cold vs warm first-chunk latency instead")
+    args = parser.parse_args()
+
+    cache_dir = configure_jit_cache(args.cache_dir)
+
+    if args.measure:
+        results = measure_first_chunk(args.sample_rate)
+        print(f"{'':<5} {'startup s':>10} {'first chunk ms':>15} {'steady chunk ms':>16}")
+        for label, r in results.items():
+            print(f"{label:<5} {r['startup_s']:>10.2f} {r['first_chunk_s'] * 1000:>15.1f} {r['steady_chunk_s'] * 1000:>16.1f}")
+        return
+
+    report = warm_up(args.sample_rate)
+    report.update({"sr": args.sample_rate, "numba_cache_dir": cache_dir, "pid": os.getpid()})
+    print(f"Analyser warm: import {report['import_s']:.2f}s, JIT {report['jit_s']:.2f}s")
+    if args.ready_file:
+        # Write then rename, so readers never see a partial file
+        tmp_file = f"{args.ready_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(report, f)
+        os.replace(tmp_file, args.ready_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from vocal.timing import StageStats
+from vocal.warmup import spawn_context, warm_up, worker_ready
+
+# The analysis modules (librosa, numba) are imported inside the worker
+# functions only, so the process driving the pool never pays that import
+
+# Per-process analyser state for incremental mode (set by the pool initializer)
+_stream_analyzer = None
+
+
+def _init_worker(sr, window_seconds, hop_seconds):
+    # Compile every feature path before the first real chunk arrives
+    warm_up(sr, window_seconds=window_seconds, hop_seconds=hop_seconds)
+
+
+def _init_stream_worker(sr, window_seconds, hop_seconds, fast_window_seconds=None, slow_hop_seconds=None):
+    global _stream_analyzer
+    from vocal.multires import MultiResolutionAnalyzer
+    from vocal.stream import SlidingWindowAnalyzer
+    _init_worker(sr, window_seconds, hop_seconds)
+    if slow_hop_seconds is None:
+        _stream_analyzer = SlidingWindowAnalyzer(sr, window_seconds=window_seconds, hop_seconds=hop_seconds)
+    else:
+        _stream_analyzer = MultiResolutionAnalyzer(
+            sr, window_seconds=window_seconds, hop_seconds=hop_seconds,
+            fast_window_seconds=fast_window_seconds or hop_seconds, slow_hop_seconds=slow_hop_seconds
+        )
+
+
+def _analyse_chunk(samples, sr):
+    from vocal.engine import analyze_chunk
+    # The worker owns its unpickled copy, so it is sanitised in place
+    return analyze_chunk(samples, sr, copy=False)
+
+
+def _analyse_hop(samples):
+    from vocal.features import analyze_speech
+    features = _stream_analyzer.push(samples)
+    return features, analyze_speech(features)
+
+
+# --- Worker Pool ---
+class FeatureWorkerPool:
+    """
+    Runs feature extraction and alerting in worker processes.
+
+    The UI submits audio with `submit` and collects finished results with
+    `poll`, so slow chunks never block capture or rendering.
+
+    In window mode every chunk is an independent job spread over
+    `max_workers` processes. At most `max_pending` jobs are outstanding; when
+    the analyser falls behind, the oldest unfinished job is cancelled (or, if
+    already running, its result discarded) and counted in `dropped`;
+    finished results are always kept for `poll`.
+
+    In incremental mode a single worker owns the SlidingWindowAnalyzer, since
+    hops must be analysed in order. With `slow_hop_seconds` set it owns a
+    MultiResolutionAnalyzer instead: loudness, ZCR and mean pitch over the
+    last `fast_window_seconds` every hop, the long-context features over
+    `window_seconds` every `slow_hop_seconds`. Audio submitted while a hop is still
+    being analysed is coalesced into the next job, so no samples are lost and
+    only the intermediate updates are skipped.
+
+    Every worker imports and JIT-compiles the feature paths in its
+    initializer; call `wait_ready` before capturing so the first chunk is
+    analysed at steady-state speed. If a worker process dies, the pool is
+    rebuilt and the jobs queued on it are dropped (an incremental analyser
+    starts over with an empty window); `restarts` counts these.
+    """
+
+    def __init__(self, sr, max_workers=None, max_pending=4, incremental=False,
+                 window_seconds=3.0, hop_seconds=0.5, fast_window_seconds=None, slow_hop_seconds=None):
+        self.sr = sr
+        self.incremental = incremental
+        self.max_pending = max(int(max_pending), 1)
+        self.dropped = 0
+        self.restarts = 0
+        self.stage_stats = StageStats() # Worker stage timings, filled when VOCAL_TIMING=1
+        self._context = spawn_context()
+        self._initargs = (sr, window_seconds, hop_seconds)
+        if incremental:
+            self.max_workers = 1
+            self._initializer = _init_stream_worker
+            self._initargs += (fast_window_seconds, slow_hop_seconds)
+        else:
+            self.max_workers = max_workers or os.cpu_count() or 1
+            self._initializer = _init_worker
+        self._executor = self._new_executor()
+        self._pending = deque() # (future, timestamp) in submission order
+        self._backlog = []      # Incremental mode: samples waiting for the busy worker
+        self._backlog_time = None
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=self._context,
+            initializer=self._initializer, initargs=self._initargs
+        )
+
+    def _restart(self):
+        """Replace a pool whose worker process died; jobs queued on it are dropped."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.dropped += len(self._pending)
+        self._pending.clear()
+        self.restarts += 1
+        self._executor = self._new_executor()
+
+    def _submit_job(self, fn, *args):
+        try:
+            return self._executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._restart()
+            return self._executor.submit(fn, *args)
+
+    def submit(self, samples, timestamp):
+        """Queue `samples` (captured up to `timestamp` seconds) for analysis."""
+        if self.incremental:
+            self._backlog.append(np.asarray(samples, dtype=np.float32))
+            self._backlog_time = timestamp
+            self._flush_backlog()
+            return
+
+        # Only unfinished jobs count against max_pending; finished results wait for poll
+        unfinished = [entry for entry in self._pending if not entry[0].done()]
+        for entry in unfinished[:max(len(unfinished) - self.max_pending + 1, 0)]:
+            if not entry[0].cancel() and entry[0].done():
+                continue # Finished just now: keep its result
+            self._pending.remove(entry)
+            self.dropped += 1
+        self._pending.append((self._submit_job(_analyse_chunk, samples, self.sr), timestamp))
+
+    def _flush_backlog(self):
+        if self._pending or not self._backlog:
+            return
+        if len(self._backlog) > 1:
+            self.dropped += len(self._backlog) - 1
+        samples = np.concatenate(self._backlog)
+        self._pending.append((self._submit_job(_analyse_hop, samples), self._backlog_time))
+        self._backlog = []
+
+    def poll(self):
+        """Return finished results as (timestamp, features, alerts), oldest first."""
+        results = []
+        while self._pending and self._pending[0][0].done():
+            future, timestamp = self._pending.popleft()
+            try:
+                features, alerts = future.result()
+            except BrokenProcessPool:
+                # A worker died: rebuild the pool instead of failing every poll from now on
+                self._restart()
+                break
+            self.stage_stats.add(features.get("stage_timings"))
+            results.append((timestamp, features, alerts))
+        if self.incremental:
+            self._flush_backlog()
+        return results
+
+    def wait_ready(self, timeout=None):
+        """
+        Start every worker and block until all of them are warmed up.
+
+        Returns the seconds waited; raises TimeoutError if `timeout` passes first.
+        """
+        start = time.perf_counter()
+        # Workers are spawned on demand, so keep one job per worker in flight
+        futures = [self._executor.submit(worker_ready) for _ in range(self.max_workers)]
+        done, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} analysis worker(s) still warming up after {timeout}s")
+        for future in done:
+            future.result()
+        return time.perf_counter() - start
+
+    @property
+    def pending(self):
+        return len(self._pending) + (1 if self._backlog else 0)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+        self._backlog = []